@@ -0,0 +1,191 @@
+import asyncio
+import io
+import sys
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import g, has_request_context, request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.util import await_only
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+
+from app import create_app, warm_up
+from cache import cache, CacheBackend, RedisCache
+from models import db
+
+#----------------------------------------------------------------------------#
+# ASGI serving mode.
+#----------------------------------------------------------------------------#
+
+# uvicorn asgi:application
+#
+# Read-only endpoints are dispatched on the event loop: the unchanged Flask
+# view runs inside AsyncSession.run_sync with db.session bound to that
+# session, so every query it issues goes through asyncpg and yields to the
+# loop instead of parking a worker thread. Everything else (form POSTs,
+# deletes, exports) is handed to the WSGI app through asgiref's thread pool.
+# Nothing else may block the loop: those requests read from the primary
+# through the async engine, so replica routing is skipped for them, and a
+# Redis page cache is called from a worker thread.
+
+ASYNC_ENDPOINTS = {
+    'venues': {'GET'},
+    'search_venues': {'GET', 'POST'},
+    'show_venue': {'GET'},
+    'artists': {'GET'},
+    'search_artists': {'GET', 'POST'},
+    'show_artist': {'GET'},
+    'shows': {'GET'},
+}
+
+# Set in the WSGI environ of requests dispatched on the event loop.
+ASYNC_DISPATCH = 'fyyur.async_dispatch'
+
+
+def async_engine_options(config):
+    url = make_url(config['SQLALCHEMY_DATABASE_URI']).set(drivername='postgresql+asyncpg')
+    if config.get('PGBOUNCER_TRANSACTION_MODE'):
+        # Prepared statements do not survive transaction pooling.
+        return url, {'poolclass': NullPool,
+                     'connect_args': {'statement_cache_size': 0}}
+    options = {
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', -1),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', False),
+    }
+    if config.get('STATEMENT_TIMEOUT_MS'):
+        options['connect_args'] = {
+            'server_settings': {'statement_timeout': str(config['STATEMENT_TIMEOUT_MS'])}
+        }
+    return url, options
+
+
+def build_environ(scope, body):
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin1'),
+        'PATH_INFO': scope['path'].encode().decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'SERVER_NAME': scope['server'][0] if scope.get('server') else 'localhost',
+        'SERVER_PORT': str(scope['server'][1]) if scope.get('server') else '80',
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        value = value.decode('latin1')
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+
+class OffLoopCache(CacheBackend):
+    # Wraps a blocking backend; on the event loop each call runs in a worker
+    # thread while the view's greenlet waits for it.
+    def __init__(self, backend):
+        self.backend = backend
+
+    def call(self, method, *args):
+        if has_request_context() and request.environ.get(ASYNC_DISPATCH):
+            return await_only(asyncio.to_thread(method, *args))
+        return method(*args)
+
+    def get(self, key):
+        return self.call(self.backend.get, key)
+
+    def set(self, key, value):
+        return self.call(self.backend.set, key, value)
+
+    def delete(self, *keys):
+        return self.call(self.backend.delete, *keys)
+
+    def clear(self):
+        return self.call(self.backend.clear)
+
+    def __len__(self):
+        return len(self.backend)
+
+
+class AsyncReadApp:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        url, options = async_engine_options(flask_app.config)
+        self.engine = create_async_engine(url, **options)
+        self.url_map = flask_app.url_map.bind('localhost')
+        if isinstance(cache.backend, RedisCache):
+            cache.backend = OffLoopCache(cache.backend)
+
+    def is_async(self, scope):
+        try:
+            endpoint, view_args = self.url_map.match(scope['path'], scope['method'])
+        except (HTTPException, RequestRedirect):
+            return False
+        return scope['method'] in ASYNC_ENDPOINTS.get(endpoint, ())
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http' or not self.is_async(scope):
+            return await self.wsgi(scope, receive, send)
+
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        async with AsyncSession(self.engine) as session:
+            environ = build_environ(scope, body)
+            environ[ASYNC_DISPATCH] = True
+            with self.flask_app.request_context(environ):
+                response = await session.run_sync(self.dispatch)
+                try:
+                    await send({
+                        'type': 'http.response.start',
+                        'status': response.status_code,
+                        'headers': [(name.lower().encode('latin1'), value.encode('latin1'))
+                                    for name, value in response.headers.to_wsgi_list()],
+                    })
+                    await send({'type': 'http.response.body', 'body': response.get_data()})
+                finally:
+                    response.close()
+
+    def dispatch(self, sync_session):
+        # Runs in SQLAlchemy's greenlet: blocking-style session calls made by
+        # the view are awaited on the event loop underneath.
+        db.session.registry.set(sync_session)
+        # The async engine reads from the primary; don't probe a replica.
+        g.db_replica = None
+        try:
+            return self.flask_app.full_dispatch_request()
+        except Exception as e:
+            return self.flask_app.handle_exception(e)
+        finally:
+            db.session.registry.clear()
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+application = AsyncReadApp(warm_up(create_app()))
@@ -0,0 +1,248 @@
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+
+from flask import current_app, request, send_from_directory, url_for
+
+#----------------------------------------------------------------------------#
+# Static assets.
+#----------------------------------------------------------------------------#
+
+# `flask fyyur build-assets` writes bundled, minified and fingerprinted
+# copies of the static files to static/dist, with .gz/.br siblings and
+# resized WebP/AVIF variants of large images, plus a manifest mapping each
+# source name to its build. At runtime url_for('static', filename=...)
+# resolves through the manifest, and files under dist/ are served
+# precompressed with a one-year immutable Cache-Control. Without a build,
+# every helper falls back to the source files.
+
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+CACHE_MAX_AGE = 365 * 24 * 3600
+
+# Bundled in this order; the output keeps the bundle's name plus a hash.
+BUNDLES = {
+    'css/fyyur.css': ['css/bootstrap.min.css', 'css/layout.main.css', 'css/main.css',
+                      'css/main.responsive.css', 'css/main.quickfix.css'],
+    'js/head.js': ['js/libs/modernizr-2.8.2.min.js', 'js/libs/moment.min.js'],
+    'js/app.js': ['js/libs/bootstrap-3.1.1.min.js', 'js/plugins.js', 'js/script.js'],
+}
+
+# Fingerprinted one by one.
+FILES = ['js/libs/jquery-1.11.1.min.js', 'js/libs/respond-1.4.2.min.js']
+FILE_DIRS = ['fonts', 'img']
+
+# Widths to generate for <picture> sources; the largest JPEG also replaces
+# the original under its own name.
+IMAGE_VARIANTS = {
+    'img/front-splash.jpg': (640, 960, 1280),
+}
+IMAGE_FORMATS = (('avif', 'image/avif', 50), ('webp', 'image/webp', 75))
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ttf', '.otf', '.eot', '.json')
+
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def fingerprint(path, content):
+    stem, ext = posixpath.splitext(path)
+    return f'{DIST}/{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}'
+
+
+def minify_css(css):
+    try:
+        import rcssmin
+        return rcssmin.cssmin(css, keep_bang_comments=True)
+    except ImportError:
+        pass
+    # Conservative fallback: comments (except /*! licences) and whitespace.
+    css = re.sub(r'/\*(?!!).*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(js, source):
+    if source.endswith('.min.js'):
+        return js
+    try:
+        import rjsmin
+        return rjsmin.jsmin(js, keep_bang_comments=True)
+    except ImportError:
+        return js
+
+
+def rewrite_css_urls(css, source, target_dir, files):
+    # Relative url()s point next to the source file; re-aim them from the
+    # bundle's directory, at the fingerprinted copy when there is one.
+    def replace(match):
+        quote, url = match.groups()
+        if re.match(r'(data:|[a-z]+:|//|/|#)', url):
+            return match.group(0)
+        path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(source), path))
+        resolved = files.get(resolved, resolved)
+        relative = posixpath.relpath(resolved, target_dir)
+        return f'url({quote}{relative}{suffix}{quote})'
+    return CSS_URL.sub(replace, css)
+
+
+def precompress(path):
+    with open(path, 'rb') as stream:
+        content = stream.read()
+    with open(path + '.gz', 'wb') as stream:
+        # mtime=0 keeps rebuilds byte-identical.
+        with gzip.GzipFile(fileobj=stream, mode='wb', compresslevel=9, mtime=0) as compressed:
+            compressed.write(content)
+    try:
+        import brotli
+    except ImportError:
+        return
+    with open(path + '.br', 'wb') as stream:
+        stream.write(brotli.compress(content, quality=11))
+
+
+def image_variants(static_folder, source):
+    """Yield (format, width, bytes) for every resized variant of `source`."""
+    try:
+        from PIL import Image, features
+    except ImportError:
+        return
+    with Image.open(os.path.join(static_folder, source)) as original:
+        original = original.convert('RGB')
+        for width in IMAGE_VARIANTS[source]:
+            if width >= original.width:
+                continue
+            image = original.resize((width, round(original.height * width / original.width)),
+                                    Image.LANCZOS)
+            for fmt, mimetype, quality in IMAGE_FORMATS + (('jpeg', 'image/jpeg', 80),):
+                if fmt != 'jpeg' and not features.check(fmt):
+                    continue
+                buffer = io.BytesIO()
+                image.save(buffer, fmt, quality=quality)
+                yield fmt, width, buffer.getvalue()
+
+
+def build(static_folder, images=True, on_file=None):
+    """Rebuild static/dist from scratch and return the manifest."""
+    dist = os.path.join(static_folder, DIST)
+    shutil.rmtree(dist, ignore_errors=True)
+    os.makedirs(dist)
+    manifest = {'files': {}, 'bundles': {}, 'images': {}}
+
+    def write(target, content):
+        path = os.path.join(static_folder, target)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as stream:
+            stream.write(content)
+        if target.endswith(COMPRESSIBLE):
+            precompress(path)
+        if on_file:
+            on_file(target, len(content))
+        return target
+
+    def read(source):
+        with open(os.path.join(static_folder, source), 'rb') as stream:
+            return stream.read()
+
+    sources = list(FILES)
+    for directory in FILE_DIRS:
+        for name in sorted(os.listdir(os.path.join(static_folder, directory))):
+            if not name.startswith('.'):
+                sources.append(f'{directory}/{name}')
+    for source in sources:
+        content = read(source)
+        manifest['files'][source] = write(fingerprint(source, content), content)
+
+    if images:
+        for source in IMAGE_VARIANTS:
+            variants = manifest['images'][source] = {}
+            for fmt, width, content in image_variants(static_folder, source):
+                variant = f"{posixpath.splitext(source)[0]}-{width}.{'jpg' if fmt == 'jpeg' else fmt}"
+                target = write(fingerprint(variant, content), content)
+                variants.setdefault(fmt, []).append([width, target])
+            if 'jpeg' in variants:
+                manifest['files'][source] = variants.pop('jpeg')[-1][1]
+
+    for name, sources in BUNDLES.items():
+        target_dir = posixpath.dirname(fingerprint(name, b''))
+        parts = []
+        for source in sources:
+            text = read(source).decode('utf-8')
+            if name.endswith('.css'):
+                parts.append(minify_css(rewrite_css_urls(text, source, target_dir, manifest['files'])))
+            else:
+                parts.append(minify_js(text, source))
+        # A lone ';' line ends each script, even one that ends in a // comment.
+        content = ('\n' if name.endswith('.css') else '\n;\n').join(parts).encode('utf-8')
+        manifest['bundles'][name] = write(fingerprint(name, content), content)
+
+    with open(os.path.join(dist, MANIFEST), 'w') as stream:
+        json.dump(manifest, stream, indent=2, sort_keys=True)
+    return manifest
+
+
+class Assets:
+    def __init__(self, app=None):
+        self.manifest = {'files': {}, 'bundles': {}, 'images': {}}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        path = os.path.join(app.static_folder, DIST, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as stream:
+                self.manifest = json.load(stream)
+        app.url_defaults(self.fingerprinted_static)
+        app.view_functions['static'] = self.send_static
+        app.jinja_env.globals.update(bundle_urls=self.bundle_urls,
+                                     image_sources=self.image_sources)
+        app.extensions['assets'] = self
+
+    def fingerprinted_static(self, endpoint, values):
+        if endpoint == 'static' and values.get('filename') in self.manifest['files']:
+            values['filename'] = self.manifest['files'][values['filename']]
+
+    def bundle_urls(self, name):
+        if name in self.manifest['bundles']:
+            return [url_for('static', filename=self.manifest['bundles'][name])]
+        return [url_for('static', filename=source) for source in BUNDLES[name]]
+
+    def image_sources(self, source):
+        # (mimetype, srcset) pairs for <picture><source>, best format first.
+        variants = self.manifest['images'].get(source, {})
+        return [(mimetype, ', '.join(f"{url_for('static', filename=target)} {width}w"
+                                     for width, target in variants[fmt]))
+                for fmt, mimetype, quality in IMAGE_FORMATS if fmt in variants]
+
+    def send_static(self, filename):
+        app = current_app
+        if not filename.startswith(DIST + '/'):
+            return app.send_static_file(filename)
+        response = None
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[encoding] and os.path.isfile(
+                    os.path.join(app.static_folder, filename + suffix)):
+                response = send_from_directory(
+                    app.static_folder, filename + suffix,
+                    mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+                response.headers['Content-Encoding'] = encoding
+                break
+        if response is None:
+            response = app.send_static_file(filename)
+        response.vary.add('Accept-Encoding')
+        # The name changes whenever the content does.
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = CACHE_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+
+
+assets = Assets()
@@ -0,0 +1,95 @@
+"""Concurrent throughput of the read routes: WSGI (threaded) vs ASGI (uvicorn).
+
+Each server runs in its own process against the database in DATABASE_URL,
+which should already be seeded (flask fyyur seed). Routes are only read,
+and the page cache is disabled so every request reaches Postgres:
+
+    DATABASE_URL=postgresql://localhost:5432/fyyur \\
+        python -m benchmarks.bench_async --concurrency 8,32,128
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.loadgen import run_load
+
+
+def read_requests(venue_id, artist_id):
+    return [
+        ('GET', '/venues', None),
+        ('GET', '/artists', None),
+        ('GET', '/shows', None),
+        ('GET', f'/venues/{venue_id}', None),
+        ('GET', f'/artists/{artist_id}', None),
+        ('GET', '/venues/search?search_term=hop', None),
+        ('POST', '/artists/search', 'search_term=band'),
+    ]
+
+
+def serve_wsgi(port):
+    from werkzeug.serving import run_simple
+    from app import app
+    run_simple('127.0.0.1', port, app, threaded=True)
+
+
+def start_server(mode, port):
+    env = dict(os.environ, FYYUR_CACHE_BACKEND='null', FYYUR_SLOW_QUERY_MS='0')
+    if mode == 'asgi':
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:application', '--port', str(port),
+                   '--log-level', 'warning', '--no-access-log']
+    else:
+        command = [sys.executable, '-m', 'benchmarks.bench_async', '--serve-wsgi', str(port)]
+    process = subprocess.Popen(command, env=env, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/')
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    sys.exit(f'{mode} server did not start on port {port}')
+
+
+def sample_ids():
+    from sqlalchemy import func
+    from app import app
+    from models import db, Venue, Artist
+    with app.app_context():
+        # The newest rows are ordinary ones; the seed puts hot venues first.
+        return (db.session.query(func.max(Venue.id)).scalar(),
+                db.session.query(func.max(Artist.id)).scalar())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', default='8,32,128')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve-wsgi', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve_wsgi:
+        return serve_wsgi(args.serve_wsgi)
+
+    requests = read_requests(*sample_ids())
+    print(f"{'mode':<6} {'clients':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode in ('wsgi', 'asgi'):
+        process = start_server(mode, args.port)
+        try:
+            for concurrency in [int(value) for value in args.concurrency.split(',')]:
+                per_route, overall = run_load(f'http://127.0.0.1:{args.port}', requests,
+                                             concurrency=concurrency, duration=args.duration)
+                print(f"{mode:<6} {concurrency:>8} {overall['throughput_rps']:>9} "
+                      f"{overall['p50_ms']:>9} {overall['p99_ms']:>9} {overall['errors']:>7}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
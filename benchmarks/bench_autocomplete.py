@@ -0,0 +1,53 @@
+"""Lookup latency of the in-process autocomplete index.
+
+Needs no database; the index is built from synthetic names:
+
+    python -m benchmarks.bench_autocomplete --names 50000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from typeahead import PrefixIndex, normalize
+
+WORDS = ['the', 'musical', 'hop', 'park', 'square', 'live', 'music', 'coffee', 'dueling',
+         'pianos', 'bar', 'wild', 'sax', 'band', 'guns', 'petals', 'blue', 'note', 'red',
+         'room', 'jazz', 'club', 'hall', 'garden', 'electric', 'ballroom', 'sound', 'stage']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--names', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    rows = [(i, ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 4))) + f' {i}')
+            for i in range(1, args.names + 1)]
+    index = PrefixIndex()
+    started = time.perf_counter()
+    index.build(rows)
+    print(f'built {len(index.names):,} names / {len(index.words):,} word keys '
+          f'in {(time.perf_counter() - started) * 1000:.0f} ms')
+
+    queries = [normalize(rng.choice(rows)[1])[:rng.randint(1, 8)] for _ in range(args.queries)]
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, args.limit)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    print(f'search  p50 {statistics.median(timings):7.1f} us  '
+          f'p99 {timings[int(len(timings) * 0.99)]:7.1f} us  max {timings[-1]:7.1f} us')
+
+    started = time.perf_counter()
+    for i in range(1000):
+        index.add(args.names + i + 1, f'New Venue {i}')
+    print(f'add     {(time.perf_counter() - started) * 1e6 / 1000:7.1f} us per insert')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Per-show cost of the `datetime` Jinja filter, before and after.
+
+Needs no database:
+
+    python -m benchmarks.bench_datetime --shows 10000
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta, timezone
+
+import babel.dates
+import dateutil.parser
+
+from views import format_datetime, format_datetimes
+
+
+def legacy_format_datetime(value, format='medium'):
+    # The filter as it was: views passed str(start_time), which was parsed
+    # back with dateutil and formatted through babel's full entry point.
+    date = dateutil.parser.parse(value)
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format, locale='en')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    start = datetime(2026, 1, 1, 20, 0, tzinfo=timezone.utc)
+    times = [start + timedelta(hours=i) for i in range(args.shows)]
+    strings = [str(value) for value in times]
+    assert [legacy_format_datetime(value, 'full') for value in strings[:50]] == \
+        format_datetimes(times[:50], 'full')
+
+    cases = [
+        ('legacy (str + dateutil + babel)', lambda: [legacy_format_datetime(value, 'full') for value in strings]),
+        ('datetime + cached pattern', lambda: [format_datetime(value, 'full') for value in times]),
+        ('format_datetimes bulk', lambda: format_datetimes(times, 'full')),
+    ]
+    for name, case in cases:
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        print(f'{name:<34} {best * 1e6 / args.shows:8.2f} us/show')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Query count and latency of the /venues area listing as venues grow.
+
+Runs against a scratch Postgres database whose tables are dropped and
+recreated on every size step, so never point it at real data:
+
+    FYYUR_BENCH_DATABASE_URI=postgresql://localhost:5432/fyyur_bench \
+        python -m benchmarks.bench_venues --sizes 100,1000,10000,50000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import app
+from models import db, Venue, Artist, Show
+
+CITIES = [('San Francisco', 'CA'), ('New York', 'NY'), ('Austin', 'TX'),
+          ('Seattle', 'WA'), ('Chicago', 'IL'), ('Denver', 'CO')]
+
+
+def seed(n_venues, shows_per_venue):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(Artist.__table__.insert(), [{
+        "name": "Bench Artist", "genres": ["Jazz"], "city": "Austin", "state": "TX"
+    }])
+    db.session.execute(Venue.__table__.insert(), [{
+        "name": f"Venue {i}",
+        "genres": ["Jazz"],
+        # Spread venues over many areas so the grouping step is exercised.
+        "city": f"{CITIES[i % len(CITIES)][0]} {i % 500}",
+        "state": CITIES[i % len(CITIES)][1],
+    } for i in range(n_venues)])
+    now = datetime.now()
+    db.session.execute(Show.__table__.insert(), [{
+        "venue_id": venue_id,
+        "venue_name": f"Venue {venue_id}",
+        "artist_id": 1,
+        "artist_name": "Bench Artist",
+        "start_time": now + timedelta(days=(j * 7) - 7),
+    } for venue_id in range(1, n_venues + 1) for j in range(shows_per_venue)])
+    db.session.commit()
+
+
+def measure(client, repeat):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_engine()
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get('/venues')
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return len(statements) // repeat, timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000,50000')
+    parser.add_argument('--shows-per-venue', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    uri = os.environ.get('FYYUR_BENCH_DATABASE_URI')
+    if not uri:
+        sys.exit('FYYUR_BENCH_DATABASE_URI must point at a scratch database')
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+
+    print(f"{'venues':>8} {'queries':>8} {'p50 ms':>10} {'max ms':>10}")
+    with app.app_context():
+        client = app.test_client()
+        for size in [int(s) for s in args.sizes.split(',')]:
+            seed(size, args.shows_per_venue)
+            queries, timings = measure(client, args.repeat)
+            print(f"{size:>8} {queries:>8} {statistics.median(timings):>10.1f} "
+                  f"{max(timings):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
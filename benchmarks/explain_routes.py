@@ -0,0 +1,143 @@
+"""EXPLAIN every query a route issues and check the expected indexes are used.
+
+Drives each route through the Flask test client, captures the SQL it runs,
+then EXPLAINs each statement with sequential scans and explicit sorts
+disabled. On a small table a seq scan, or the primary key plus a sort,
+is cheaper than the keyset index, and the planner would rightly pick it.
+With both penalized, any index that can serve a query's filter and
+ordering is chosen, so the check is about whether the indexes fit the
+queries and not about table size; it passes from a few hundred venues up.
+Exits non-zero if a route's plans do not use its expected indexes. shows is
+partitioned, so its plans name each partition's index
+(shows_y2026m01_start_time_id_venue_id_idx); those are reported as the
+parent index they were created from (ix_shows_start_time_id):
+
+    python -m benchmarks.explain_routes
+"""
+import argparse
+import json
+import sys
+
+from sqlalchemy import event
+
+from app import app
+from cache import cache, NullCache
+from models import db, Venue, Artist
+
+# Partition indexes are attached to the partitioned table's index through
+# pg_inherits.
+PARENT_INDEXES = """
+    SELECT child.relname, parent.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    WHERE child.relkind = 'i'
+"""
+
+# route -> indexes its plans must use (venue_id/artist_id filled in at runtime)
+ROUTES = [
+    ('/venues', {'ix_venues_state_city_id', 'ix_shows_start_time_id'}),
+    ('/artists', {'ix_artists_name_id'}),
+    ('/shows', {'ix_shows_start_time_id'}),
+    ('/venues/{venue_id}', {'ix_shows_venue_id_start_time'}),
+    ('/artists/{artist_id}', {'ix_shows_artist_id_start_time'}),
+    ('/venues/search?search_term=hop', {'ix_venues_search_tsv', 'ix_venues_search_trgm'}),
+    ('/artists/search?search_term=band', {'ix_artists_search_tsv', 'ix_artists_search_trgm'}),
+]
+
+
+def capture(client, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            statements.append((statement, parameters))
+
+    engine = db.get_engine()
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} returned {response.status_code}')
+    return statements
+
+
+def plan_indexes(node, found):
+    if isinstance(node, dict):
+        if 'Index Name' in node:
+            found.add(node['Index Name'])
+        for value in node.values():
+            plan_indexes(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            plan_indexes(value, found)
+    return found
+
+
+def parent_indexes():
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(PARENT_INDEXES)
+        return dict(cursor.fetchall())
+    finally:
+        connection.close()
+
+
+def root_index(name, parents):
+    while name in parents:
+        name = parents[name]
+    return name
+
+
+def explain(statement, parameters):
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('SET LOCAL enable_sort = off')
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + statement, parameters)
+        plan = cursor.fetchone()[0]
+        return json.loads(plan) if isinstance(plan, str) else plan
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--verbose', action='store_true', help='print every plan')
+    args = parser.parse_args(argv)
+
+    # Detail pages must reach the database on every request.
+    cache.backend = NullCache()
+    failures = 0
+    with app.app_context():
+        ids = {
+            'venue_id': db.session.query(Venue.id).order_by(Venue.id).limit(1).scalar(),
+            'artist_id': db.session.query(Artist.id).order_by(Artist.id).limit(1).scalar(),
+        }
+        if None in ids.values():
+            sys.exit('The database needs at least one venue and one artist')
+        parents = parent_indexes()
+        client = app.test_client()
+        for route, expected in ROUTES:
+            url = route.format(**ids)
+            used = set()
+            for statement, parameters in capture(client, url):
+                plan = explain(statement, parameters)
+                plan_indexes(plan, used)
+                if args.verbose:
+                    print(statement, json.dumps(plan, indent=2), sep='\n')
+            used = {root_index(name, parents) for name in used}
+            missing = expected - used
+            status = 'ok' if not missing else 'MISSING ' + ', '.join(sorted(missing))
+            print(f'{url:<40} {status}  (used: {", ".join(sorted(used)) or "none"})')
+            failures += bool(missing)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
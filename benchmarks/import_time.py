@@ -0,0 +1,87 @@
+"""Startup cost of `import app` and create_app(), checked against a budget.
+
+Each measurement runs in a fresh interpreter, best of --repeat. Exits 1 if
+importing app pulls in a deferred dependency or either step is over its
+budget, and prints the slowest imports to look at first:
+
+    python -m benchmarks.import_time --import-budget-ms 400 --create-budget-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Importing app must not load these; create_app() does.
+DEFERRED = ['sqlalchemy', 'flask_sqlalchemy', 'flask_migrate', 'alembic', 'flask_wtf',
+            'wtforms', 'babel', 'dateutil', 'models', 'forms', 'views']
+
+MEASURE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'create_ms': (created - imported) * 1000}))
+"""
+
+DEFERRED_CHECK = """
+import json, sys
+import app
+print(json.dumps([name for name in %r if name in sys.modules]))
+"""
+
+
+def run(code, env, *options):
+    return subprocess.run([sys.executable, *options, '-c', code], env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def slowest_imports(env, top):
+    # -X importtime writes "self | cumulative | name" to stderr.
+    stderr = run('import app; app.create_app()', env, '-X', 'importtime').stderr
+    rows = []
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[0].startswith('import time:') and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--import-budget-ms', type=float, default=400)
+    parser.add_argument('--create-budget-ms', type=float, default=1500)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, SQLALCHEMY_SILENCE_UBER_WARNING='1')
+    failures = []
+    loaded = json.loads(run(DEFERRED_CHECK % (DEFERRED,), env).stdout)
+    if loaded:
+        failures.append(f"import app loads deferred modules: {', '.join(loaded)}")
+
+    samples = [json.loads(run(MEASURE, env).stdout) for _ in range(args.repeat)]
+    import_ms = min(sample['import_ms'] for sample in samples)
+    create_ms = min(sample['create_ms'] for sample in samples)
+    print(f'import app        {import_ms:8.1f} ms  (budget {args.import_budget_ms:.0f} ms)')
+    print(f'create_app()      {create_ms:8.1f} ms  (budget {args.create_budget_ms:.0f} ms)')
+    if import_ms > args.import_budget_ms:
+        failures.append(f'import app took {import_ms:.1f} ms')
+    if create_ms > args.create_budget_ms:
+        failures.append(f'create_app() took {create_ms:.1f} ms')
+
+    print('\nSlowest imports (cumulative):')
+    for microseconds, name in slowest_imports(env, args.top):
+        print(f'{microseconds / 1000:10.1f} ms  {name}')
+
+    for failure in failures:
+        print(f'FAIL: {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Small concurrent HTTP load generator shared by the benchmarks."""
+import http.client
+import math
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile of an unsorted list.
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return round(ordered[rank - 1], 3)
+
+
+def summarize(latencies, wall_time, errors=0):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_time, 1) if wall_time else None,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def run_load(base_url, requests, concurrency=16, duration=10.0):
+    """Replay `requests` ((method, path, body) tuples) round-robin from
+    `concurrency` threads for `duration` seconds, one keep-alive connection
+    per thread. Returns ({(method, path): summary}, overall summary); GET
+    and POST on the same path are separate routes."""
+    parts = urlsplit(base_url)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(offset):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+        index = offset
+        local = []
+        try:
+            while time.perf_counter() < deadline:
+                method, path, body = requests[index % len(requests)]
+                index += 1
+                headers = {'Content-Type': 'application/x-www-form-urlencoded'} if body else {}
+                started = time.perf_counter()
+                try:
+                    connection.request(method, path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status < 500
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+                    ok = False
+                local.append(((method, path), (time.perf_counter() - started) * 1000, ok))
+        finally:
+            connection.close()
+            with lock:
+                for route, elapsed, ok in local:
+                    if ok:
+                        latencies[route].append(elapsed)
+                    else:
+                        errors[route] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    wall_time = time.perf_counter() - started
+    per_route = {route: summarize(latencies[route], wall_time, errors[route])
+                 for route in set(latencies) | set(errors)}
+    everything = [value for values in latencies.values() for value in values]
+    return per_route, summarize(everything, wall_time, sum(errors.values()))
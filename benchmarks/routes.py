@@ -0,0 +1,197 @@
+"""Latency percentiles and throughput for every route, at several data sizes.
+
+For each size the scratch database is rebuilt from the migrations and
+filled by the seed generator. Then every route is timed twice: in-process
+through the Flask test client, and over HTTP against a threaded server
+driven by a concurrent load generator. Results go to a JSON artifact. If a
+baseline is given, the run fails when a route's p95 regresses past the
+tolerance, and also when the baseline file is missing. Baselines depend on
+the machine, so record one on the machine that runs the gate by adding
+--write-baseline:
+
+    FYYUR_BENCH_DATABASE_URI=postgresql://localhost:5432/fyyur_bench \\
+        python -m benchmarks.routes --sizes 10000,100000 \\
+        --baseline benchmarks/baseline.json
+
+The scratch database is dropped and recreated; never point it at real data.
+DELETE /venues/<id> is not exercised because each call consumes a venue.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+uri = os.environ.get('FYYUR_BENCH_DATABASE_URI')
+if __name__ == '__main__' and not uri:
+    sys.exit('FYYUR_BENCH_DATABASE_URI must point at a scratch database')
+if uri:
+    # config.py reads DATABASE_URL when the app is imported. The page cache
+    # is off, or every repeat after the first would time a cache hit.
+    os.environ['DATABASE_URL'] = uri
+    os.environ['FYYUR_CACHE_BACKEND'] = 'null'
+
+from flask_migrate import upgrade  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from app import app  # noqa: E402
+from benchmarks.loadgen import run_load, summarize  # noqa: E402
+from models import db, Venue, Artist  # noqa: E402
+import seed  # noqa: E402
+
+VENUE_FORM = [('name', 'Bench Venue'), ('city', 'Austin'), ('state', 'TX'),
+              ('address', '1 Main St'), ('phone', '512-555-0100'), ('genres', 'Jazz'),
+              ('genres', 'Blues'), ('facebook_link', 'https://www.facebook.com/bench'),
+              ('website_link', 'https://bench.example.com'), ('image_link', '')]
+ARTIST_FORM = [(key, value) for key, value in VENUE_FORM if key != 'address']
+
+
+def route_requests(venue_id, artist_id):
+    # (label, method, path, form body) for every route except DELETE.
+    show_form = urlencode({'venue_id': venue_id, 'artist_id': artist_id,
+                           'start_time': '2030-01-01 20:00:00'})
+    return [
+        ('index', 'GET', '/', None),
+        ('venues', 'GET', '/venues', None),
+        ('search_venues', 'POST', '/venues/search', 'search_term=hop'),
+        ('show_venue', 'GET', f'/venues/{venue_id}', None),
+        ('create_venue_form', 'GET', '/venues/create', None),
+        ('create_venue_submission', 'POST', '/venues/create', urlencode(VENUE_FORM)),
+        ('artists', 'GET', '/artists', None),
+        ('search_artists', 'POST', '/artists/search', 'search_term=band'),
+        ('autocomplete', 'GET', '/autocomplete?q=mus', None),
+        ('show_artist', 'GET', f'/artists/{artist_id}', None),
+        ('edit_artist', 'GET', f'/artists/{artist_id}/edit', None),
+        ('edit_artist_submission', 'POST', f'/artists/{artist_id}/edit', urlencode(ARTIST_FORM)),
+        ('edit_venue', 'GET', f'/venues/{venue_id}/edit', None),
+        ('edit_venue_submission', 'POST', f'/venues/{venue_id}/edit', urlencode(VENUE_FORM)),
+        ('create_artist_form', 'GET', '/artists/create', None),
+        ('create_artist_submission', 'POST', '/artists/create', urlencode(ARTIST_FORM)),
+        ('shows', 'GET', '/shows', None),
+        ('create_shows', 'GET', '/shows/create', None),
+        ('create_show_submission', 'POST', '/shows/create', show_form),
+        ('export_rows', 'GET', '/export/venues.csv', None),
+        ('metrics', 'GET', '/metrics', None),
+    ]
+
+
+def reset_database(shows):
+    db.session.remove()
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql('DROP SCHEMA public CASCADE; CREATE SCHEMA public')
+    upgrade()
+    seed.seed(venues=max(10, shows // 500), artists=max(10, shows // 100), shows=shows)
+    # A typical (not hot) venue and artist, picked the same way on every run.
+    venue_id = db.session.query(Venue.id).order_by(Venue.id.desc()).limit(1).scalar()
+    artist_id = db.session.query(Artist.id).order_by(Artist.id.desc()).limit(1).scalar()
+    db.session.remove()
+    return venue_id, artist_id
+
+
+def bench_test_client(requests, repeat, warmup=3):
+    client = app.test_client()
+    results = {}
+    for label, method, path, body in requests:
+        kwargs = {'data': body, 'content_type': 'application/x-www-form-urlencoded'} if body else {}
+        for _ in range(warmup):
+            client.open(path, method=method, **kwargs)
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            request_started = time.perf_counter()
+            response = client.open(path, method=method, **kwargs)
+            latencies.append((time.perf_counter() - request_started) * 1000)
+            errors += response.status_code >= 500
+        results[label] = summarize(latencies, time.perf_counter() - started, errors)
+    return results
+
+
+def bench_http(requests, concurrency, duration):
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        labels = {(method, path): label for label, method, path, body in requests}
+        per_route, overall = run_load(f'http://127.0.0.1:{server.server_port}',
+                                     [(method, path, body) for label, method, path, body in requests],
+                                     concurrency=concurrency, duration=duration)
+    finally:
+        server.shutdown()
+    return {labels[route]: stats for route, stats in per_route.items()}, overall
+
+
+def regressions(results, baseline, tolerance, slack_ms=2.0):
+    found = []
+    for size, phases in results['sizes'].items():
+        base_routes = baseline.get('sizes', {}).get(size, {}).get('test_client', {})
+        for label, stats in phases['test_client'].items():
+            base = base_routes.get(label, {}).get('p95_ms')
+            current = stats['p95_ms']
+            if base and current and current > base * (1 + tolerance) and current - base > slack_ms:
+                found.append(f'{label} @ {size} shows: p95 {current:.1f} ms vs baseline {base:.1f} ms')
+    return found
+
+
+def compare_to_baseline(results, path, tolerance):
+    """Return the reasons the run fails against the baseline at `path`."""
+    if not os.path.exists(path):
+        return [f'no baseline at {path}; run with --write-baseline to create one']
+    with open(path) as stream:
+        return regressions(results, json.load(stream), tolerance)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000', help='show counts to seed')
+    parser.add_argument('--repeat', type=int, default=50, help='test-client requests per route')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of HTTP load per size')
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--baseline', help='fail on p95 regressions against this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--write-baseline', action='store_true',
+                        help='store this run as the new --baseline')
+    args = parser.parse_args(argv)
+    if args.write_baseline and not args.baseline:
+        parser.error('--write-baseline needs --baseline')
+
+    results = {'generated_at': datetime.now(timezone.utc).isoformat(), 'sizes': {}}
+    with app.app_context():
+        for size in [int(value) for value in args.sizes.split(',')]:
+            print(f'Seeding {size} shows...', file=sys.stderr)
+            requests = route_requests(*reset_database(size))
+            test_client = bench_test_client(requests, args.repeat)
+            http_routes, http_overall = bench_http(requests, args.concurrency, args.duration)
+            results['sizes'][str(size)] = {
+                'test_client': test_client,
+                'http': {'routes': http_routes, 'overall': http_overall,
+                         'concurrency': args.concurrency},
+            }
+            print(f"{'route':<26} {'p50':>8} {'p95':>8} {'p99':>8}   (ms, {size} shows)")
+            for label, stats in test_client.items():
+                print(f"{label:<26} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+            print(f"HTTP x{args.concurrency}: {http_overall['throughput_rps']} req/s, "
+                  f"p99 {http_overall['p99_ms']} ms, {http_overall['errors']} errors")
+
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    print(f'Wrote {args.output}')
+
+    if args.baseline and args.write_baseline:
+        with open(args.baseline, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f'Wrote baseline {args.baseline}')
+    elif args.baseline:
+        found = compare_to_baseline(results, args.baseline, args.tolerance)
+        for line in found:
+            print('REGRESSION', line, file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+#----------------------------------------------------------------------------#
+# Cache backends.
+#----------------------------------------------------------------------------#
+
+
+class CacheBackend:
+    """Interface every cache backend implements.
+
+    Values are the assembled page dicts; a backend returns None for a key
+    that is missing or expired.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+
+class NullCache(CacheBackend):
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache(CacheBackend):
+    # In-process cache bounded by entry count, least recently used first out.
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    # Shared backend so every worker sees the same entries and invalidations.
+    def __init__(self, url, ttl=300, prefix='fyyur:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        self.client.setex(self.prefix + key, self.ttl, pickle.dumps(value))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+#----------------------------------------------------------------------------#
+# Page cache.
+#----------------------------------------------------------------------------#
+
+
+def venue_key(venue_id):
+    return f'venue:{venue_id}'
+
+
+def artist_key(artist_id):
+    return f'artist:{artist_id}'
+
+
+def genres_key(kind):
+    return f'genres:{kind}'
+
+
+class PageCache:
+    def __init__(self, app=None):
+        self.backend = NullCache()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('CACHE_BACKEND', 'lru')
+        ttl = app.config.get('CACHE_TTL', 300)
+        if backend == 'lru':
+            if app.config.get('WORKERS', 1) > 1:
+                # Other workers never see this one's invalidations.
+                ttl = min(ttl, app.config.get('CACHE_LRU_SHARED_TTL', 5))
+            self.backend = LRUCache(app.config.get('CACHE_MAX_ENTRIES', 1024), ttl)
+        elif backend == 'redis':
+            self.backend = RedisCache(app.config['CACHE_REDIS_URL'], ttl)
+        elif backend == 'null':
+            self.backend = NullCache()
+        else:
+            raise ValueError(f'Unknown CACHE_BACKEND {backend!r}')
+        app.extensions['page_cache'] = self
+
+    def get(self, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def invalidate(self, *keys):
+        self.invalidations += len(keys)
+        self.backend.delete(*keys)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "evictions": getattr(self.backend, 'evictions', None)
+        }
+
+
+cache = PageCache()
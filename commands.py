@@ -0,0 +1,180 @@
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+import assets
+import counters
+import fanout
+import ingest
+import partitions
+import seed
+import templating
+from tasks import tasks
+
+#----------------------------------------------------------------------------#
+# CLI commands (flask fyyur ...).
+#----------------------------------------------------------------------------#
+
+fyyur_cli = AppGroup('fyyur', help='Fyyur maintenance commands.')
+
+
+@fyyur_cli.command('rollover-shows')
+@click.option('--full', is_flag=True,
+              help='Recompute every show counter instead of only shows that started since the last run.')
+def rollover_shows_command(full):
+    """Move shows that have started from upcoming to past counters."""
+    updated = counters.rollover_shows(full=full)
+    click.echo(f'Rolled over show counters as of {counters.rollover_watermark()} '
+               f'({updated} rows updated).')
+
+
+@fyyur_cli.command('fanout-shows')
+@click.option('--venue', 'venue_id', type=int, help='Only the shows of this venue.')
+@click.option('--artist', 'artist_id', type=int, help='Only the shows of this artist.')
+@click.option('--chunk-size', type=click.IntRange(min=1),
+              help='Shows per transaction (default FANOUT_CHUNK_SIZE).')
+def fanout_shows_command(venue_id, artist_id, chunk_size):
+    """Copy venue/artist names and image links to shows that are out of date."""
+    kinds = [('venue', venue_id), ('artist', artist_id)]
+    if venue_id is not None or artist_id is not None:
+        kinds = [(kind, owner_id) for kind, owner_id in kinds if owner_id is not None]
+    for kind, owner_id in kinds:
+        updated = fanout.fan_out(kind, owner_id, chunk_size=chunk_size,
+                                 on_chunk=lambda n: click.echo(f'{n} shows updated', err=True))
+        click.echo(f'Updated {kind} columns on {updated} shows.')
+
+
+@fyyur_cli.command('import')
+@click.argument('kind', type=click.Choice(['venues', 'artists', 'shows']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']),
+              help='Input format; guessed from the file extension by default.')
+@click.option('--batch-size', default=ingest.BATCH_SIZE, show_default=True)
+@click.option('--max-errors', default=20, show_default=True,
+              help='How many rejected rows to print.')
+def import_command(kind, path, fmt, batch_size, max_errors):
+    """Bulk load venues, artists or shows from a CSV or NDJSON file."""
+    started = time.perf_counter()
+
+    def progress(report):
+        elapsed = time.perf_counter() - started
+        click.echo(f'{report.loaded} rows loaded ({report.loaded / elapsed:,.0f} rows/s)', err=True)
+
+    with open(path, newline='', encoding='utf-8') as stream:
+        report = ingest.import_rows(kind, ingest.read_rows(stream, fmt or ingest.detect_format(path)),
+                                    batch_size=batch_size, on_batch=progress)
+    if kind == 'shows' and report.loaded:
+        counters.rollover_shows(full=True)
+    elapsed = time.perf_counter() - started
+    for line_num, errors in report.errors[:max_errors]:
+        click.echo(f'line {line_num}: {errors}' if line_num else str(errors), err=True)
+    click.echo(f'Imported {report.loaded} of {report.read} {kind} in {elapsed:.1f}s '
+               f'({report.loaded / elapsed:,.0f} rows/s), {len(report.errors)} rejected.')
+
+
+@fyyur_cli.command('seed')
+@click.option('--venues', default=1000, show_default=True, type=click.IntRange(min=1))
+@click.option('--artists', default=5000, show_default=True, type=click.IntRange(min=1))
+@click.option('--shows', default=100000, show_default=True, type=click.IntRange(min=0))
+@click.option('--seed', 'random_seed', default=42, show_default=True,
+              help='Same seed, same data.')
+@click.option('--hot-venues', default=10, show_default=True,
+              help='Number of venues that receive --hot-share of all shows.')
+@click.option('--hot-share', default=0.3, show_default=True, type=click.FloatRange(0, 1))
+@click.option('--past-share', default=0.5, show_default=True, type=click.FloatRange(0, 1),
+              help='Fraction of shows that start before today.')
+@click.option('--days', default=365, show_default=True, type=click.IntRange(min=1),
+              help='Shows are spread this many days either side of today.')
+def seed_command(venues, artists, shows, random_seed, hot_venues, hot_share, past_share, days):
+    """Generate a synthetic dataset for load and scale testing."""
+    started = time.perf_counter()
+
+    def progress(written):
+        elapsed = time.perf_counter() - started
+        click.echo(f'{written} shows written ({written / elapsed:,.0f} rows/s)', err=True)
+
+    written = seed.seed(venues=venues, artists=artists, shows=shows, seed=random_seed,
+                        hot_venues=hot_venues, hot_share=hot_share, past_share=past_share,
+                        days=days, on_chunk=progress)
+    click.echo(f'Seeded {venues} venues, {artists} artists and {written} shows '
+               f'in {time.perf_counter() - started:.1f}s.')
+
+
+@fyyur_cli.command('worker')
+@click.option('--poll-interval', default=1.0, show_default=True,
+              help='Seconds to wait when no job is due.')
+@click.option('--burst', is_flag=True, help='Exit once no job is due instead of polling.')
+def worker_command(poll_interval, burst):
+    """Run background jobs queued in the jobs table."""
+    def report(job, ok):
+        click.echo(f"Job {job.id} {job.name}{tuple(job.args)} "
+                   f"{'done' if ok else 'failed'} (attempt {job.attempts})", err=True)
+
+    try:
+        tasks.work(poll_interval=poll_interval, burst=burst, on_job=report)
+    except KeyboardInterrupt:
+        pass
+
+
+@fyyur_cli.command('build-assets')
+@click.option('--no-images', is_flag=True, help='Skip the resized WebP/AVIF image variants.')
+def build_assets_command(no_images):
+    """Bundle, minify, fingerprint and precompress static files into static/dist."""
+    total = 0
+
+    def report(target, size):
+        nonlocal total
+        total += size
+        click.echo(f'{size:>10,}  {target}', err=True)
+
+    manifest = assets.build(current_app.static_folder, images=not no_images, on_file=report)
+    click.echo(f"Built {len(manifest['bundles'])} bundles and {len(manifest['files'])} files "
+               f"({total:,} bytes) into static/{assets.DIST}; restart the app to pick them up.")
+
+
+@fyyur_cli.command('compile-templates')
+def compile_templates_command():
+    """Precompile every template into the Jinja bytecode cache."""
+    directory = current_app.config.get('TEMPLATE_CACHE_DIR')
+    if not directory:
+        raise click.ClickException('TEMPLATE_CACHE_DIR is not set; nothing to compile into.')
+    started = time.perf_counter()
+    names = templating.compile_templates(current_app)
+    click.echo(f'Compiled {len(names)} templates into {directory} '
+               f'in {time.perf_counter() - started:.2f}s.')
+
+
+@fyyur_cli.command('partitions')
+@click.option('--ahead', type=click.IntRange(min=0),
+              help='Months of partitions to keep ahead of this one [default: PARTITION_MONTHS_AHEAD].')
+@click.option('--retain-months', type=click.IntRange(min=0),
+              help='Past months to leave attached; 0 keeps them all [default: PARTITION_RETAIN_MONTHS].')
+@click.option('--drop', is_flag=True, help='Drop old partitions instead of moving them to the archive schema.')
+@click.option('--dry-run', is_flag=True, help='Only list the partitions and what would change.')
+def partitions_command(ahead, retain_months, drop, dry_run):
+    """Create upcoming shows partitions and archive old ones."""
+    if ahead is None:
+        ahead = current_app.config.get('PARTITION_MONTHS_AHEAD', 12)
+    if retain_months is None:
+        retain_months = current_app.config.get('PARTITION_RETAIN_MONTHS', 0)
+    create, archive = partitions.plan(ahead, retain_months)
+    for month, (name, rows) in sorted(partitions.partitions().items()):
+        click.echo(f'{name}  ~{rows:,} rows', err=True)
+    if dry_run:
+        for month in create:
+            click.echo(f'Would create {partitions.partition_name(month)}.')
+        for month, name in archive:
+            click.echo(f"Would {'drop' if drop else 'archive'} {name}.")
+        return
+    for month in create:
+        moved = partitions.create_partition(month)
+        click.echo(f'Created {partitions.partition_name(month)}'
+                   + (f' ({moved} rows moved from {partitions.DEFAULT}).' if moved else '.'))
+    for month, name in archive:
+        partitions.archive_partition(name, drop=drop)
+        click.echo(f"{'Dropped' if drop else 'Archived'} {name}"
+                   + ('.' if drop else f' to {partitions.ARCHIVE_SCHEMA}.{name}.'))
+    if not create and not archive:
+        click.echo('Partitions are up to date.')
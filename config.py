@@ -1,12 +1,120 @@
+import json
 import os
-SECRET_KEY = os.urandom(32)
+import tempfile
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+
+def load_secret_key(path):
+    # Every worker, and every restart, must sign sessions with the same key,
+    # or a flash message set on one worker is dropped by the next. The first
+    # process to start generates it; os.link() fails if another won the race.
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as stream:
+                stream.write(os.urandom(32))
+            os.link(temp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(temp_path)
+    with open(path, 'rb') as stream:
+        return stream.read()
+
+
+# Set FYYUR_SECRET_KEY when workers run on more than one host.
+SECRET_KEY = (os.environ.get('FYYUR_SECRET_KEY')
+              or load_secret_key(os.path.join(basedir, 'instance', 'secret_key')))
+
 # Enable debug mode.
 DEBUG = True
 
 # Connect to the database
-# TODO IMPLEMENT DATABASE URL
-SQLALCHEMY_DATABASE_URI = 'postgresql://ilhoon@localhost:5432/fyyur'
+SQLALCHEMY_DATABASE_URI = os.environ.get(
+    'DATABASE_URL', 'postgresql://ilhoon@localhost:5432/fyyur')
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+# Connection pool, per worker process. Size workers so that
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays under max_connections.
+DB_POOL_SIZE = int(os.environ.get('FYYUR_DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('FYYUR_DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('FYYUR_DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.environ.get('FYYUR_DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.environ.get('FYYUR_DB_POOL_PRE_PING', '1') == '1'
+
+# Read replicas, comma-separated URLs. Listing and search pages read from
+# them in turn; a replica more than REPLICA_MAX_LAG seconds behind (0: no
+# limit) is skipped, and clients that just wrote stay on the primary for
+# REPLICA_PIN_SECONDS.
+REPLICA_URIS = [uri for uri in os.environ.get('FYYUR_REPLICA_URLS', '').split(',') if uri]
+REPLICA_CHECK_INTERVAL = float(os.environ.get('FYYUR_REPLICA_CHECK_INTERVAL', 5))
+REPLICA_MAX_LAG = float(os.environ.get('FYYUR_REPLICA_MAX_LAG', 30))
+REPLICA_PIN_SECONDS = int(os.environ.get('FYYUR_REPLICA_PIN_SECONDS', 10))
+
+# Behind PgBouncer in transaction pooling mode: no app-side pool and no
+# session-level settings on the connection.
+PGBOUNCER_TRANSACTION_MODE = os.environ.get('FYYUR_PGBOUNCER_TRANSACTION_MODE', '0') == '1'
+
+# statement_timeout in milliseconds for each request's transactions (0
+# disables it), and per-route overrides keyed by endpoint name, e.g.
+# '{"search_venues": 2000}'. Migrations and CLI commands run without one.
+STATEMENT_TIMEOUT_MS = int(os.environ.get('FYYUR_STATEMENT_TIMEOUT_MS', 5000))
+STATEMENT_TIMEOUTS = {
+    # Exports stream whole tables; the cursor stays open for the download.
+    'export_rows': 0,
+    **json.loads(os.environ.get('FYYUR_STATEMENT_TIMEOUTS', '{}'))
+}
+
+# Cache for assembled venue/artist detail pages: 'redis' (shared, the
+# default when CACHE_REDIS_URL is set), 'lru' (per process) or 'null' to
+# disable. A write invalidates an lru cache only in the worker that handled
+# it, so with more than one worker lru entries expire after
+# CACHE_LRU_SHARED_TTL seconds instead of CACHE_TTL.
+CACHE_REDIS_URL = os.environ.get('FYYUR_CACHE_REDIS_URL')
+CACHE_BACKEND = os.environ.get('FYYUR_CACHE_BACKEND', 'redis' if CACHE_REDIS_URL else 'lru')
+CACHE_MAX_ENTRIES = int(os.environ.get('FYYUR_CACHE_MAX_ENTRIES', 1024))
+CACHE_TTL = int(os.environ.get('FYYUR_CACHE_TTL', 300))
+CACHE_LRU_SHARED_TTL = int(os.environ.get('FYYUR_CACHE_LRU_SHARED_TTL', 5))
+
+# Worker processes serving the app; gunicorn.conf.py sets it for gunicorn.
+WORKERS = int(os.environ.get('FYYUR_WORKERS', 1))
+
+# Statements slower than this (milliseconds) are written to error.log with
+# their route and parameters; 0 disables the slow-query log.
+SLOW_QUERY_MS = int(os.environ.get('FYYUR_SLOW_QUERY_MS', 200))
+
+# Renamed venues/artists with at most this many shows update them inside the
+# edit's transaction; larger ones in background chunks of FANOUT_CHUNK_SIZE.
+FANOUT_INLINE_LIMIT = int(os.environ.get('FYYUR_FANOUT_INLINE_LIMIT', 5000))
+FANOUT_CHUNK_SIZE = int(os.environ.get('FYYUR_FANOUT_CHUNK_SIZE', 5000))
+
+# Background tasks: 'thread' runs them on TASK_WORKERS in-process threads
+# (overflow and failed runs go to the jobs table), 'db' queues every task
+# for `flask fyyur worker`, 'inline' runs them in the request.
+TASK_MODE = os.environ.get('FYYUR_TASK_MODE', 'thread')
+TASK_WORKERS = int(os.environ.get('FYYUR_TASK_WORKERS', 2))
+TASK_QUEUE_SIZE = int(os.environ.get('FYYUR_TASK_QUEUE_SIZE', 100))
+TASK_MAX_ATTEMPTS = int(os.environ.get('FYYUR_TASK_MAX_ATTEMPTS', 5))
+# Seconds before the first retry, doubling after each failed attempt.
+TASK_RETRY_BACKOFF = int(os.environ.get('FYYUR_TASK_RETRY_BACKOFF', 5))
+# A job still 'running' after this many seconds is assumed lost and rerun.
+TASK_LEASE = int(os.environ.get('FYYUR_TASK_LEASE', 600))
+
+# Seconds between refreshes of each worker's autocomplete index from the
+# database, which pick up changes made by other workers (0 disables them).
+AUTOCOMPLETE_REFRESH = int(os.environ.get('FYYUR_AUTOCOMPLETE_REFRESH', 30))
+
+# Monthly shows partitions `flask fyyur partitions` keeps created ahead of
+# the current month, and how many past months it leaves attached (0 keeps
+# them all).
+PARTITION_MONTHS_AHEAD = int(os.environ.get('FYYUR_PARTITION_MONTHS_AHEAD', 12))
+PARTITION_RETAIN_MONTHS = int(os.environ.get('FYYUR_PARTITION_RETAIN_MONTHS', 0))
+
+# Compiled Jinja templates, shared by every worker on the host ('' turns the
+# cache off). TEMPLATE_WARMUP renders each template once when serving
+# (gunicorn, uvicorn, python app.py); CLI commands skip it.
+TEMPLATE_CACHE_DIR = os.environ.get('FYYUR_TEMPLATE_CACHE_DIR',
+                                    os.path.join(basedir, 'instance', 'jinja_cache'))
+TEMPLATE_WARMUP = os.environ.get('FYYUR_TEMPLATE_WARMUP', '1') == '1'
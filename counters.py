@@ -0,0 +1,89 @@
+from datetime import datetime
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+
+from models import db, Watermark
+
+#----------------------------------------------------------------------------#
+# Show counters.
+#----------------------------------------------------------------------------#
+
+# past_shows_count/upcoming_shows_count on venues and artists are accurate
+# as of the rollover watermark: a show counts as past once its start_time is
+# at or before the watermark. The rollover job advances the watermark and
+# moves only the shows that crossed it, so request handlers never have to
+# write counters while reading. Rows whose counters change get a new
+# updated_at, like any other change to them.
+
+ROLLOVER = 'show_rollover'
+
+OWNERS = (('venues', 'venue_id'), ('artists', 'artist_id'))
+
+MOVE_CROSSED_SHOWS = """
+    UPDATE {table} AS owner
+    SET upcoming_shows_count = owner.upcoming_shows_count - crossed.n,
+        past_shows_count = owner.past_shows_count + crossed.n,
+        updated_at = now()
+    FROM (SELECT {fk} AS owner_id, count(*) AS n
+          FROM shows
+          WHERE start_time > :since AND start_time <= :until
+          GROUP BY {fk}) AS crossed
+    WHERE owner.id = crossed.owner_id
+"""
+
+RECOMPUTE_COUNTERS = """
+    UPDATE {table} AS owner
+    SET past_shows_count = totals.past,
+        upcoming_shows_count = totals.upcoming,
+        updated_at = now()
+    FROM (SELECT o.id,
+                 count(s.id) FILTER (WHERE s.start_time <= :until) AS past,
+                 count(s.id) FILTER (WHERE s.start_time > :until) AS upcoming
+          FROM {table} AS o LEFT JOIN shows AS s ON s.{fk} = o.id
+          GROUP BY o.id) AS totals
+    WHERE owner.id = totals.id
+      AND (owner.past_shows_count, owner.upcoming_shows_count)
+          IS DISTINCT FROM (totals.past, totals.upcoming)
+"""
+
+
+def rollover_watermark():
+    watermark = Watermark.query.get(ROLLOVER)
+    return watermark.value if watermark else None
+
+
+def show_cutoff():
+    # Shows starting at or before this naive local time count as past.
+    watermark = rollover_watermark()
+    if watermark is None:
+        return datetime.now()
+    return watermark.astimezone().replace(tzinfo=None)
+
+
+def rollover_shows(full=False):
+    """Advance the rollover watermark to now and fix counters up to it.
+
+    Returns the number of venue and artist rows that were updated. With
+    `full`, or on the first run, every counter is recomputed from scratch.
+    """
+    # Serialize concurrent runs; both would otherwise move the same shows.
+    db.session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"),
+                       {'name': ROLLOVER})
+    since = rollover_watermark()
+    until = db.session.query(func.now()).scalar()
+    updated = 0
+    for table, fk in OWNERS:
+        if full or since is None:
+            result = db.session.execute(
+                text(RECOMPUTE_COUNTERS.format(table=table, fk=fk)), {'until': until})
+        else:
+            result = db.session.execute(
+                text(MOVE_CROSSED_SHOWS.format(table=table, fk=fk)),
+                {'since': since, 'until': until})
+        updated += result.rowcount
+    db.session.execute(insert(Watermark.__table__).values(
+        name=ROLLOVER, value=until).on_conflict_do_update(
+        index_elements=['name'], set_={'value': until}))
+    db.session.commit()
+    return updated
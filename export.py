@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from models import db, Venue, Artist, Show
+
+#----------------------------------------------------------------------------#
+# Streaming export.
+#----------------------------------------------------------------------------#
+
+# Rows come off a server-side cursor (yield_per) and are serialized as they
+# arrive, so an export holds at most one fetch batch in memory regardless of
+# table size. Rows are ordered by (updated_at, id): a client syncing
+# incrementally passes the largest updated_at it has seen as updated_since.
+
+FETCH_SIZE = 1000
+
+EXPORTS = {
+    'venues': (Venue, ['id', 'name', 'genres', 'city', 'state', 'address', 'phone',
+                       'website', 'image_link', 'facebook_link', 'seeking_talent',
+                       'seeking_description', 'past_shows_count', 'upcoming_shows_count',
+                       'updated_at']),
+    'artists': (Artist, ['id', 'name', 'genres', 'city', 'state', 'phone', 'website',
+                         'image_link', 'facebook_link', 'seeking_venue',
+                         'seeking_description', 'past_shows_count', 'upcoming_shows_count',
+                         'updated_at']),
+    'shows': (Show, ['id', 'venue_id', 'venue_name', 'venue_image_link', 'artist_id',
+                     'artist_name', 'artist_image_link', 'start_time', 'updated_at']),
+}
+
+
+def export_query(kind, updated_since=None, start=None, end=None):
+    model, columns = EXPORTS[kind]
+    query = db.session.query(*[getattr(model, column) for column in columns])
+    if updated_since is not None:
+        query = query.filter(model.updated_at > updated_since)
+    if kind == 'shows':
+        if start is not None:
+            query = query.filter(Show.start_time >= start)
+        if end is not None:
+            query = query.filter(Show.start_time < end)
+    return query.order_by(model.updated_at, model.id).yield_per(FETCH_SIZE)
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def ndjson_lines(kind, query):
+    columns = EXPORTS[kind][1]
+    for row in query:
+        yield json.dumps(dict(zip(columns, row)), default=json_default) + '\n'
+
+
+def csv_lines(kind, query):
+    columns = EXPORTS[kind][1]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(query, 1):
+        writer.writerow([
+            ','.join(value) if isinstance(value, list) else
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        ])
+        # Hand the WSGI server one chunk per fetch batch, not one per row.
+        if count % FETCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+SERIALIZERS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv'),
+}
@@ -1,16 +1,27 @@
 from fabric.api import local, settings, abort
-from fabric.contrib.console import confirm
 
 # prepare for deployment
 
 
 def test():
+    # The benchmark needs FYYUR_BENCH_DATABASE_URI pointing at a scratch
+    # database; the tests that need one read DATABASE_URL.
+    with settings(warn_only=True):
+        result = local("python -m pytest -q tests")
+    if result.failed:
+        abort("Tests failed.")
     with settings(warn_only=True):
         result = local(
-            "python test_tasks.py -v && python test_users.py -v", capture=True
+            "python -m benchmarks.routes --baseline benchmarks/baseline.json"
         )
-    if result.failed and not confirm("Tests failed. Continue?"):
-        abort("Aborted at user request.")
+    if result.failed:
+        abort("Benchmarks failed or regressed; see bench_output.json. "
+              "Without a baseline yet, run `fab write_baseline` first.")
+
+
+def write_baseline():
+    # Records this machine's numbers as the baseline test() compares against.
+    local("python -m benchmarks.routes --baseline benchmarks/baseline.json --write-baseline")
 
 
 def commit():
@@ -40,7 +51,7 @@ def heroku():
 
 def heroku_test():
     local(
-        "heroku run python test_tasks.py -v && heroku run python test_users.py -v"
+        "heroku run python -m pytest -v tests"
     )
 
 
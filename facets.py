@@ -0,0 +1,45 @@
+from sqlalchemy import cast, text
+from sqlalchemy.dialects.postgresql import array
+
+from cache import cache, genres_key
+from models import db, Venue, Artist
+from replicas import replicas
+
+#----------------------------------------------------------------------------#
+# Genre facets.
+#----------------------------------------------------------------------------#
+
+# /venues?genre= and /artists?genre= filter with genres @> ARRAY[genre],
+# which the GIN indexes ix_venues_genres and ix_artists_genres answer. The
+# filter chips above those lists show how many rows carry each genre.
+# Counting means unnesting every row, so all the counts come from one
+# grouped query and are kept in the page cache for CACHE_TTL. Creating,
+# editing or deleting a venue or artist drops them. They are always read
+# from the primary, even when the list page itself is served by a replica:
+# counts from a lagging replica would be cached after that invalidation
+# and outlive it.
+
+MODELS = {'venue': Venue, 'artist': Artist}
+
+GENRE_COUNTS = """
+    SELECT genre, count(*) AS count
+    FROM {table}, unnest(genres) AS genre
+    GROUP BY genre
+    ORDER BY count DESC, genre
+"""
+
+
+def has_genre(model, genre):
+    return model.genres.op('@>')(cast(array([genre]), model.genres.type))
+
+
+def genre_counts(kind):
+    """Return [(genre, rows)] for `kind`, most common first."""
+    counts = cache.get(genres_key(kind))
+    if counts is None:
+        table = MODELS[kind].__tablename__
+        with replicas.primary():
+            counts = [(genre, count) for genre, count in
+                      db.session.execute(text(GENRE_COUNTS.format(table=table)))]
+        cache.set(genres_key(kind), counts)
+    return counts
@@ -0,0 +1,97 @@
+from flask import current_app
+from sqlalchemy import text
+
+from cache import cache, venue_key, artist_key
+from models import db
+from tasks import task, tasks
+
+#----------------------------------------------------------------------------#
+# Show fan-out.
+#----------------------------------------------------------------------------#
+
+# Shows carry copies of their venue's and artist's name and image link so
+# listings need no join. When an edit changes those columns, the copies are
+# brought back in line from the owner row. If the owner has at most
+# FANOUT_INLINE_LIMIT shows, this is one UPDATE inside the edit's own
+# transaction. Larger owners are handed to the background task queue, which
+# works in FANOUT_CHUNK_SIZE-row transactions, so an edit never locks a large range
+# of shows at once. Every chunk recopies the owner's current values, so
+# overlapping runs and a later `flask fyyur fanout-shows` end up the same.
+
+FANOUTS = {
+    'venue': {'table': 'venues', 'fk': 'venue_id', 'name': 'venue_name',
+              'image': 'venue_image_link', 'other_fk': 'artist_id', 'other_key': artist_key},
+    'artist': {'table': 'artists', 'fk': 'artist_id', 'name': 'artist_name',
+               'image': 'artist_image_link', 'other_fk': 'venue_id', 'other_key': venue_key},
+}
+
+COUNT_SHOWS = """
+    SELECT count(*) FROM (SELECT 1 FROM shows WHERE {fk} = :owner_id LIMIT :limit) AS s
+"""
+
+COPY_OWNER_COLUMNS = """
+    UPDATE shows
+    SET {name} = owner.name, {image} = owner.image_link, updated_at = now()
+    FROM {table} AS owner
+    WHERE owner.id = shows.{fk} AND shows.id IN (
+        SELECT s.id FROM shows AS s JOIN {table} AS o ON o.id = s.{fk}
+        WHERE {owner_filter}
+          (s.{name}, s.{image}) IS DISTINCT FROM (o.name, o.image_link)
+        LIMIT :limit)
+    RETURNING shows.{other_fk}
+"""
+
+
+def copy_owner_columns(kind, owner_id=None, limit=None):
+    # Returns the other-side id of every changed show; their cached pages
+    # list the old values.
+    spec = FANOUTS[kind]
+    statement = COPY_OWNER_COLUMNS.format(
+        owner_filter=f's.{spec["fk"]} = :owner_id AND' if owner_id is not None else '', **spec)
+    result = db.session.execute(text(statement), {'owner_id': owner_id, 'limit': limit})
+    return [other_id for (other_id,) in result]
+
+
+def update_shows(kind, owner_id):
+    """Copy a renamed venue's or artist's columns to its shows.
+
+    Call after changing the owner and before committing. Returns the cache
+    keys the fan-out made stale, or None when the owner has too many shows
+    and schedule() must be called once the edit is committed.
+    """
+    limit = current_app.config.get('FANOUT_INLINE_LIMIT', 5000)
+    db.session.flush()
+    count = db.session.execute(text(COUNT_SHOWS.format(**FANOUTS[kind])),
+                               {'owner_id': owner_id, 'limit': limit + 1}).scalar()
+    if count > limit:
+        return None
+    return [FANOUTS[kind]['other_key'](other_id)
+            for other_id in set(copy_owner_columns(kind, owner_id))]
+
+
+def fan_out(kind, owner_id=None, chunk_size=None, on_chunk=None):
+    """Copy owner columns to stale shows in chunks, committing each one.
+
+    With no `owner_id` every venue (or artist) is checked. Returns the
+    number of shows updated.
+    """
+    chunk_size = chunk_size or current_app.config.get('FANOUT_CHUNK_SIZE', 5000)
+    updated = 0
+    while True:
+        other_ids = copy_owner_columns(kind, owner_id, chunk_size)
+        db.session.commit()
+        if not other_ids:
+            return updated
+        cache.invalidate(*[FANOUTS[kind]['other_key'](other_id) for other_id in set(other_ids)])
+        updated += len(other_ids)
+        if on_chunk:
+            on_chunk(updated)
+
+
+@task('fanout_shows')
+def fan_out_task(kind, owner_id):
+    fan_out(kind, owner_id)
+
+
+def schedule(kind, owner_id):
+    tasks.enqueue('fanout_shows', kind, owner_id)
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from facets import has_genre
+from models import db, Venue, Artist, Show
+
+#----------------------------------------------------------------------------#
+# Show feed.
+#----------------------------------------------------------------------------#
+
+# /shows lists shows in start_time order from `from` (default: now) up to
+# `to`, optionally only at venues in `city` or by artists playing `genre`.
+# The time range is a range scan of ix_shows_start_time_id, which the
+# keyset cursor continues, and only the columns the page renders are
+# selected. City and genre are semi-joins against venues and artists in
+# the same statement, so a filter costs one round trip however many venues
+# or artists match; Postgres picks between ix_shows_venue_id_start_time for
+# a handful of venues and the time index for a popular genre.
+
+FILTERS = ('from', 'to', 'city', 'genre')
+
+COLUMNS = [Show.id, Show.start_time, Show.venue_id, Show.venue_name,
+           Show.artist_id, Show.artist_name, Show.artist_image_link]
+
+
+def parse_time(value, end=False):
+    # A date or an ISO 8601 datetime; a bare date as `to` includes that day.
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if end and len(value) == len('YYYY-MM-DD'):
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def parse_filters(args):
+    """The shows filters in `args`, parsed; unusable values are dropped."""
+    filters = {
+        'from': parse_time(args.get('from')),
+        'to': parse_time(args.get('to'), end=True),
+        'city': args.get('city', '').strip() or None,
+        'genre': args.get('genre', '').strip() or None,
+    }
+    return {name: value for name, value in filters.items() if value is not None}
+
+
+def show_query(filters):
+    query = db.session.query(*COLUMNS).filter(
+        Show.start_time >= filters.get('from', datetime.now(timezone.utc)))
+    if 'to' in filters:
+        query = query.filter(Show.start_time < filters['to'])
+    if 'city' in filters:
+        query = query.filter(Show.venue_id.in_(select(Venue.id).where(
+            func.lower(Venue.city) == filters['city'].lower())))
+    if 'genre' in filters:
+        query = query.filter(Show.artist_id.in_(select(Artist.id).where(
+            has_genre(Artist, filters['genre']))))
+    return query
@@ -0,0 +1,35 @@
+import multiprocessing
+import os
+
+# gunicorn -c gunicorn.conf.py
+#
+# The app is created once in the master (imports, template warm-up) and the
+# workers are forked from it, sharing those pages copy-on-write. Workers keep
+# no state of their own that a request depends on: sessions are signed
+# cookies with the shared SECRET_KEY, and anything else lives in Postgres or
+# the configured cache, so any worker can serve any request.
+
+wsgi_app = 'app:create_app()'
+preload_app = True
+bind = os.environ.get('FYYUR_BIND', '0.0.0.0:' + os.environ.get('PORT', '5000'))
+# Exported so the app, loaded after this file, knows it has sibling workers.
+os.environ.setdefault('FYYUR_WORKERS', str(multiprocessing.cpu_count() * 2 + 1))
+workers = int(os.environ['FYYUR_WORKERS'])
+threads = int(os.environ.get('FYYUR_THREADS', 1))
+# Recycle workers now and then so slow leaks cannot build up; the jitter
+# keeps them from all restarting at once.
+max_requests = int(os.environ.get('FYYUR_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    # Runs in the master before the workers are forked: warm the templates
+    # and load the autocomplete index there, so workers start with both.
+    from app import warm_up
+    from typeahead import typeahead
+    app = warm_up(server.app.wsgi())
+    with app.app_context():
+        try:
+            typeahead.load()
+        except Exception:
+            app.logger.exception('Could not preload the autocomplete index')
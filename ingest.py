@@ -0,0 +1,213 @@
+import csv
+import io
+import json
+import os
+
+from werkzeug.datastructures import MultiDict
+
+from forms import VenueForm, ArtistForm, ShowForm
+from models import db, Venue, Artist, Show
+
+#----------------------------------------------------------------------------#
+# Bulk ingest.
+#----------------------------------------------------------------------------#
+
+# Rows are validated with the same WTForms classes the create pages use,
+# then written in batches: venues and artists through a single executemany
+# INSERT per batch, shows through COPY. Each batch commits on its own so
+# memory and transaction size stay bounded however large the file is.
+
+BATCH_SIZE = 5000
+
+# form field -> model column, for each importable kind.
+COLUMNS = {
+    'venues': (Venue, VenueForm, {
+        'name': 'name', 'genres': 'genres', 'city': 'city', 'state': 'state',
+        'address': 'address', 'phone': 'phone', 'image_link': 'image_link',
+        'facebook_link': 'facebook_link', 'website_link': 'website',
+        'seeking_talent': 'seeking_talent', 'seeking_description': 'seeking_description',
+    }),
+    'artists': (Artist, ArtistForm, {
+        'name': 'name', 'genres': 'genres', 'city': 'city', 'state': 'state',
+        'phone': 'phone', 'image_link': 'image_link',
+        'facebook_link': 'facebook_link', 'website_link': 'website',
+        'seeking_venue': 'seeking_venue', 'seeking_description': 'seeking_description',
+    }),
+    'shows': (Show, ShowForm, {
+        'venue_id': 'venue_id', 'artist_id': 'artist_id', 'start_time': 'start_time',
+    }),
+}
+
+SHOW_COPY_COLUMNS = ('venue_id', 'venue_name', 'venue_image_link',
+                     'artist_id', 'artist_name', 'artist_image_link', 'start_time')
+
+TRUE_VALUES = ('1', 'true', 't', 'yes', 'y', 'on')
+
+
+class UnreadableRow:
+    # Stands in for a line that could not be parsed; rejected like a row
+    # that fails validation.
+    def __init__(self, errors):
+        self.errors = errors
+
+
+def read_rows(stream, fmt):
+    # Yields (line number, dict) pairs without reading the whole file.
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'ndjson':
+        for line_num, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_num, UnreadableRow({'json': [str(exc)]})
+                continue
+            if not isinstance(row, dict):
+                yield line_num, UnreadableRow({'json': ['Expected a JSON object']})
+                continue
+            yield line_num, row
+    else:
+        raise ValueError(f'Unknown format {fmt!r}')
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    return 'ndjson' if extension in ('.ndjson', '.jsonl', '.json') else 'csv'
+
+
+def to_formdata(row):
+    formdata = MultiDict()
+    for field, value in row.items():
+        if value is None:
+            continue
+        if field == 'genres':
+            if isinstance(value, str):
+                value = [genre.strip() for genre in value.split(',')]
+            for genre in value:
+                if genre:
+                    formdata.add(field, genre)
+        elif field.startswith('seeking_') and field != 'seeking_description':
+            if str(value).strip().lower() in TRUE_VALUES:
+                formdata.add(field, 'y')
+        else:
+            formdata.add(field, str(value))
+    return formdata
+
+
+def copy_rows(table, columns, rows):
+    """COPY `rows` (sequences ordered like `columns`) into `table`.
+
+    Runs on the session's connection, so it is part of the current
+    transaction. None is written as NULL; lists as Postgres array literals.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            '{' + ','.join('"' + str(item).replace('\\', '\\\\').replace('"', '\\"') + '"'
+                           for item in value) + '}'
+            if isinstance(value, (list, tuple)) else value
+            for value in row
+        ])
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+class ShowNames:
+    # Resolves the denormalized venue/artist names on shows, one IN query
+    # per batch for ids that have not been seen yet.
+    def __init__(self):
+        self.venues = {}
+        self.artists = {}
+
+    def load(self, model, cache, ids):
+        missing = [entity_id for entity_id in ids if entity_id not in cache]
+        if missing:
+            for entity_id, name, image_link in db.session.query(
+                    model.id, model.name, model.image_link).filter(model.id.in_(missing)):
+                cache[entity_id] = (name, image_link)
+
+    def resolve(self, rows):
+        self.load(Venue, self.venues, {row['venue_id'] for row in rows})
+        self.load(Artist, self.artists, {row['artist_id'] for row in rows})
+        resolved = []
+        for row in rows:
+            venue = self.venues.get(row['venue_id'])
+            artist = self.artists.get(row['artist_id'])
+            if venue and artist:
+                resolved.append((row['venue_id'], venue[0], venue[1],
+                                 row['artist_id'], artist[0], artist[1],
+                                 row['start_time'].isoformat()))
+        return resolved
+
+
+class ImportReport:
+    def __init__(self):
+        self.read = 0
+        self.loaded = 0
+        self.errors = []
+
+
+def import_rows(kind, rows, batch_size=BATCH_SIZE, on_batch=None):
+    """Validate and load (line number, dict) pairs of `kind` into the db."""
+    model, form_class, columns = COLUMNS[kind]
+    report = ImportReport()
+    form = form_class(formdata=None, meta={'csrf': False})
+    names = ShowNames() if kind == 'shows' else None
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        if names is not None:
+            resolved = names.resolve(batch)
+            if len(resolved) != len(batch):
+                report.errors.append(
+                    (None, {'venue_id/artist_id': [f'{len(batch) - len(resolved)} rows '
+                                                   'reference unknown venues or artists']}))
+            copy_rows('shows', SHOW_COPY_COLUMNS, resolved)
+            report.loaded += len(resolved)
+        else:
+            db.session.execute(model.__table__.insert(), batch)
+            report.loaded += len(batch)
+        db.session.commit()
+        batch.clear()
+        if on_batch:
+            on_batch(report)
+
+    for line_num, row in rows:
+        report.read += 1
+        if isinstance(row, UnreadableRow):
+            report.errors.append((line_num, row.errors))
+            continue
+        if names is not None and not row.get('start_time'):
+            # ShowForm would silently fall back to its default start_time.
+            report.errors.append((line_num, {'start_time': ['This field is required.']}))
+            continue
+        # Reuse one bound form; process() resets every field from the row.
+        form.process(to_formdata(row))
+        if not form.validate():
+            report.errors.append((line_num, form.errors))
+            continue
+        values = {column: form[field].data for field, column in columns.items()}
+        if names is not None:
+            try:
+                values['venue_id'] = int(values['venue_id'])
+                values['artist_id'] = int(values['artist_id'])
+            except (TypeError, ValueError):
+                report.errors.append((line_num, {'venue_id/artist_id': ['Not a valid id']}))
+                continue
+        batch.append(values)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return report
@@ -0,0 +1,66 @@
+import logging
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+#----------------------------------------------------------------------------#
+# SQL instrumentation.
+#----------------------------------------------------------------------------#
+
+# Every statement run on any engine is counted and timed against the
+# current request. Totals go out as a Server-Timing header, and statements
+# slower than SLOW_QUERY_MS are logged with their route and parameters.
+
+slow_query_logger = logging.getLogger('fyyur.slow_query')
+
+MAX_LOGGED_PARAMETERS = 500
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    if not has_request_context():
+        return
+    g.db_queries = g.get('db_queries', 0) + 1
+    g.db_time = g.get('db_time', 0.0) + elapsed
+    threshold = g.get('slow_query_ms')
+    if threshold and elapsed * 1000 >= threshold:
+        slow_query_logger.warning(
+            'Slow query (%.1f ms) on %s %s: %s; parameters: %.*r',
+            elapsed * 1000, request.method, request.path, ' '.join(statement.split()),
+            MAX_LOGGED_PARAMETERS, parameters)
+
+
+@event.listens_for(Engine, 'handle_error')
+def discard_query_timer(context):
+    # Failed statements never reach after_cursor_execute.
+    if context.connection is not None and context.connection.info.get('query_started'):
+        context.connection.info['query_started'].pop()
+
+
+def init_app(app):
+    slow_query_ms = app.config.get('SLOW_QUERY_MS', 200)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.slow_query_ms = slow_query_ms
+
+    @app.after_request
+    def add_server_timing(response):
+        if 'request_started' not in g:
+            return response
+        total = (time.perf_counter() - g.request_started) * 1000
+        queries = g.get('db_queries', 0)
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={g.get("db_time", 0.0) * 1000:.2f};desc="{queries} queries", '
+            f'app;dur={total:.2f}')
+        return response
@@ -0,0 +1,46 @@
+"""search indexes for venues and artists
+
+Revision ID: 5b1f0c7e9a42
+Revises: 464d95f3f0ab
+Create Date: 2026-10-18 17:10:02.318406
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1f0c7e9a42'
+down_revision = '464d95f3f0ab'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # array_to_string() is only STABLE, so the document is built by an
+    # IMMUTABLE wrapper that index expressions are allowed to call.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION fyyur_search_document(
+            name text, city text, state text, genres text[])
+        RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT coalesce(name, '') || ' ' || coalesce(city, '') || ' ' ||
+                   coalesce(state, '') || ' ' || coalesce(array_to_string(genres, ' '), '')
+        $$
+    """)
+    for table in ('venues', 'artists'):
+        op.execute(f"""
+            CREATE INDEX ix_{table}_search_tsv ON {table} USING gin (
+                to_tsvector('simple'::regconfig,
+                            fyyur_search_document(name, city, state, genres)))
+        """)
+        op.execute(f"""
+            CREATE INDEX ix_{table}_search_trgm ON {table} USING gin (
+                fyyur_search_document(name, city, state, genres) gin_trgm_ops)
+        """)
+
+
+def downgrade():
+    for table in ('venues', 'artists'):
+        op.execute(f'DROP INDEX IF EXISTS ix_{table}_search_trgm')
+        op.execute(f'DROP INDEX IF EXISTS ix_{table}_search_tsv')
+    op.execute('DROP FUNCTION IF EXISTS fyyur_search_document(text, text, text, text[])')
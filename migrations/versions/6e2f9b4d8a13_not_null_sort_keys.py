@@ -0,0 +1,34 @@
+"""name, city and state are required on venues and artists
+
+Revision ID: 6e2f9b4d8a13
+Revises: a9d3e7b2c4f1
+Create Date: 2026-10-19 09:14:26.731805
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2f9b4d8a13'
+down_revision = 'a9d3e7b2c4f1'
+branch_labels = None
+depends_on = None
+
+# The keyset cursors compare (state, city, id) and (name, id) as row
+# values, which never match a NULL: such rows would drop out of the lists.
+COLUMNS = [('name', sa.String()), ('city', sa.String(length=120)),
+           ('state', sa.String(length=120))]
+
+
+def upgrade():
+    for table in ('venues', 'artists'):
+        for column, type_ in COLUMNS:
+            op.execute(f"UPDATE {table} SET {column} = '' WHERE {column} IS NULL")
+            op.alter_column(table, column, existing_type=type_, nullable=False)
+
+
+def downgrade():
+    for table in ('artists', 'venues'):
+        for column, type_ in COLUMNS:
+            op.alter_column(table, column, existing_type=type_, nullable=True)
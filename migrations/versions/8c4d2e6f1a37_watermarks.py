@@ -0,0 +1,28 @@
+"""watermarks table for incremental maintenance jobs
+
+Revision ID: 8c4d2e6f1a37
+Revises: 5b1f0c7e9a42
+Create Date: 2026-10-18 17:42:51.604113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4d2e6f1a37'
+down_revision = '5b1f0c7e9a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('watermarks',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('watermarks')
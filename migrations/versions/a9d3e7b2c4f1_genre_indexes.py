@@ -0,0 +1,49 @@
+"""GIN indexes on venue and artist genres
+
+Revision ID: a9d3e7b2c4f1
+Revises: f3a8c5d1b9e6
+Create Date: 2026-10-18 23:12:47.530914
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3e7b2c4f1'
+down_revision = 'f3a8c5d1b9e6'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_venues_genres', 'venues'),
+    ('ix_artists_genres', 'artists'),
+]
+
+# Left behind by a failed or cancelled concurrent build; IF NOT EXISTS
+# would skip it.
+INVALID_INDEX = """
+    SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+    WHERE pg_class.relname = :name AND NOT pg_index.indisvalid
+"""
+
+
+def upgrade():
+    # Same as the hot path indexes: built concurrently, outside a transaction.
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        op.execute('SET statement_timeout = 0')
+        for name, table in INDEXES:
+            if bind.execute(text(INVALID_INDEX), {'name': name}).first():
+                op.drop_index(name, table_name=table,
+                              postgresql_concurrently=True, if_exists=True)
+            op.create_index(name, table, ['genres'], unique=False,
+                            postgresql_using='gin',
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table in reversed(INDEXES):
+            op.drop_index(name, table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
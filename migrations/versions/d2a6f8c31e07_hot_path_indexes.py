@@ -0,0 +1,57 @@
+"""indexes for the hot query paths
+
+Revision ID: d2a6f8c31e07
+Revises: b7e93a0d4c15
+Create Date: 2026-10-18 18:31:12.804377
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6f8c31e07'
+down_revision = 'b7e93a0d4c15'
+branch_labels = None
+depends_on = None
+
+# name, table, columns, covering (INCLUDE) columns
+INDEXES = [
+    ('ix_venues_state_city_id', 'venues', ['state', 'city', 'id'], []),
+    ('ix_venues_name_id', 'venues', ['name', 'id'], []),
+    ('ix_artists_name_id', 'artists', ['name', 'id'], []),
+    ('ix_shows_venue_id_start_time', 'shows', ['venue_id', 'start_time'],
+     ['artist_id', 'artist_name', 'artist_image_link']),
+    ('ix_shows_artist_id_start_time', 'shows', ['artist_id', 'start_time'],
+     ['venue_id', 'venue_name', 'venue_image_link']),
+    ('ix_shows_start_time_id', 'shows', ['start_time', 'id'], ['venue_id']),
+]
+
+# A concurrent build that fails or is cancelled leaves an INVALID index
+# behind, which IF NOT EXISTS would then keep forever.
+INVALID_INDEX = """
+    SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+    WHERE pg_class.relname = :name AND NOT pg_index.indisvalid
+"""
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction block; building outside
+    # one keeps the tables writable while the indexes are created.
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        op.execute('SET statement_timeout = 0')
+        for name, table, columns, include in INDEXES:
+            if bind.execute(text(INVALID_INDEX), {'name': name}).first():
+                op.drop_index(name, table_name=table,
+                              postgresql_concurrently=True, if_exists=True)
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_include=include,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in reversed(INDEXES):
+            op.drop_index(name, table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
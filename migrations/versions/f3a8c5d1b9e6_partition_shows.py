@@ -0,0 +1,104 @@
+"""partition shows by month of start_time
+
+Revision ID: f3a8c5d1b9e6
+Revises: e4b9c1f7a2d8
+Create Date: 2026-10-18 22:05:41.318406
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8c5d1b9e6'
+down_revision = 'e4b9c1f7a2d8'
+branch_labels = None
+depends_on = None
+
+# Partitions are created this many months past the current one; after
+# that `flask fyyur partitions` keeps them ahead.
+MONTHS_AHEAD = 12
+
+COLUMNS = ('id, start_time, venue_id, venue_name, artist_id, artist_name, '
+           'artist_image_link, venue_image_link, updated_at')
+
+# name, columns, covering (INCLUDE) columns
+INDEXES = [
+    ('ix_shows_venue_id_start_time', ['venue_id', 'start_time'],
+     ['artist_id', 'artist_name', 'artist_image_link']),
+    ('ix_shows_artist_id_start_time', ['artist_id', 'start_time'],
+     ['venue_id', 'venue_name', 'venue_image_link']),
+    ('ix_shows_start_time_id', ['start_time', 'id'], ['venue_id']),
+    ('ix_shows_updated_at', ['updated_at'], []),
+]
+
+
+def shows_table(name, partitioned):
+    # The primary key of a partitioned table must contain the partition key.
+    return op.create_table(name,
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('shows_id_seq'::regclass)"), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('venue_name', sa.String(), nullable=False),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('artist_name', sa.String(), nullable=False),
+    sa.Column('artist_image_link', sa.String(length=500), nullable=True),
+    sa.Column('venue_image_link', sa.String(length=500), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['artists.id'], name='shows_artist_id_fkey'),
+    sa.ForeignKeyConstraint(['venue_id'], ['venues.id'], name='shows_venue_id_fkey'),
+    sa.PrimaryKeyConstraint(*(['id', 'start_time'] if partitioned else ['id']), name='shows_pkey'),
+    **({'postgresql_partition_by': 'RANGE (start_time)'} if partitioned else {})
+    )
+
+
+def move_aside():
+    # Copying every show takes longer than the app's statement_timeout.
+    op.execute('SET LOCAL statement_timeout = 0')
+    # Index names are schema-wide, so the old table's must be out of the way.
+    op.rename_table('shows', 'shows_old')
+    op.execute('ALTER TABLE shows_old RENAME CONSTRAINT shows_pkey TO shows_old_pkey')
+    for name, columns, include in INDEXES:
+        op.execute(f'ALTER INDEX IF EXISTS {name} RENAME TO {name}_old')
+
+
+def copy_back():
+    op.execute(f'INSERT INTO shows ({COLUMNS}) SELECT {COLUMNS} FROM shows_old')
+    op.execute('ALTER SEQUENCE shows_id_seq OWNED BY shows.id')
+    op.drop_table('shows_old')
+    for name, columns, include in INDEXES:
+        op.create_index(name, 'shows', columns, unique=False, postgresql_include=include)
+    op.execute('ANALYZE shows')
+
+
+def add_months(month, months):
+    month_index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    first, last = bind.execute(sa.text('SELECT min(start_time), max(start_time) FROM shows')).first()
+    now = datetime.now(timezone.utc)
+    month = (first or now).astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = max(add_months(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), MONTHS_AHEAD + 1),
+              add_months((last or now).astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0), 1))
+
+    move_aside()
+    shows_table('shows', partitioned=True)
+    while month < end:
+        following = add_months(month, 1)
+        op.execute(f"CREATE TABLE shows_y{month:%Y}m{month:%m} PARTITION OF shows "
+                   f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')")
+        month = following
+    # Catches shows outside every month partition until one is created for them.
+    op.execute('CREATE TABLE shows_default PARTITION OF shows DEFAULT')
+    copy_back()
+
+
+def downgrade():
+    move_aside()
+    shows_table('shows', partitioned=False)
+    copy_back()
@@ -1,7 +1,9 @@
-from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import JSONB
 
-db = SQLAlchemy()
+from replicas import RoutingSQLAlchemy
+
+db = RoutingSQLAlchemy()
 
 #----------------------------------------------------------------------------#
 # Models.
@@ -10,12 +12,20 @@ db = SQLAlchemy()
 
 class Venue(db.Model):
     __tablename__ = 'venues'
+    __table_args__ = (
+        # /venues area listing, keyset-paginated by (state, city, id).
+        db.Index('ix_venues_state_city_id', 'state', 'city', 'id'),
+        # Alphabetical browsing and empty-term search.
+        db.Index('ix_venues_name_id', 'name', 'id'),
+        # ?genre= filter (genres @> ARRAY[genre]).
+        db.Index('ix_venues_genres', 'genres', postgresql_using='gin'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String)
+    name = db.Column(db.String, nullable=False)
     genres = db.Column(db.ARRAY(db.String), nullable=False)
-    city = db.Column(db.String(120))
-    state = db.Column(db.String(120))
+    city = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), nullable=False)
     address = db.Column(db.String(120))
     phone = db.Column(db.String(120))
     website = db.Column(db.String(120))
@@ -29,6 +39,8 @@ class Venue(db.Model):
         db.Integer, nullable=False, default=0)
     upcoming_shows_count = db.Column(
         db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False,
+                           server_default=func.now(), onupdate=func.now(), index=True)
 
     def __repr__(self):
         return f'<Venue ID: {self.id}, name: {self.name}>'
@@ -36,12 +48,16 @@ class Venue(db.Model):
 
 class Artist(db.Model):
     __tablename__ = 'artists'
+    __table_args__ = (
+        db.Index('ix_artists_name_id', 'name', 'id'),
+        db.Index('ix_artists_genres', 'genres', postgresql_using='gin'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String)
+    name = db.Column(db.String, nullable=False)
     genres = db.Column(db.ARRAY(db.String), nullable=False)
-    city = db.Column(db.String(120))
-    state = db.Column(db.String(120))
+    city = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), nullable=False)
     phone = db.Column(db.String(120))
     website = db.Column(db.String(120))
     image_link = db.Column(db.String(500))
@@ -54,13 +70,28 @@ class Artist(db.Model):
         db.Integer, nullable=False, default=0)
     upcoming_shows_count = db.Column(
         db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False,
+                           server_default=func.now(), onupdate=func.now(), index=True)
 
     def __repr__(self):
         return f'<Artist ID: {self.id}, name: {self.name}>'
 
 
+# shows is range-partitioned by month of start_time (see partitions.py);
+# its primary key in the database is (id, start_time).
 class Show(db.Model):
     __tablename__ = 'shows'
+    __table_args__ = (
+        # Venue page past/upcoming split; covers the artist columns it renders.
+        db.Index('ix_shows_venue_id_start_time', 'venue_id', 'start_time',
+                 postgresql_include=['artist_id', 'artist_name', 'artist_image_link']),
+        # Artist page past/upcoming split; covers the venue columns it renders.
+        db.Index('ix_shows_artist_id_start_time', 'artist_id', 'start_time',
+                 postgresql_include=['venue_id', 'venue_name', 'venue_image_link']),
+        # /shows keyset pagination and the per-venue upcoming count on /venues.
+        db.Index('ix_shows_start_time_id', 'start_time', 'id',
+                 postgresql_include=['venue_id']),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     venue_id = db.Column(db.Integer, db.ForeignKey(
@@ -73,6 +104,42 @@ class Show(db.Model):
     artist_image_link = db.Column(db.String(500))
     start_time = db.Column(db.DateTime(timezone=True),
                            nullable=False, server_default=func.now())
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False,
+                           server_default=func.now(), onupdate=func.now(), index=True)
 
     def __repr__(self):
         return f'<Show ID: {self.id}, venue_id: {self.venue_id}, artist_id: {self.artist_id}>'
+
+
+class Watermark(db.Model):
+    __tablename__ = 'watermarks'
+
+    # High-water marks of incremental maintenance jobs, keyed by job name.
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f'<Watermark name: {self.name}, value: {self.value}>'
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # The worker's claim query: due jobs in run_at order.
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    # Background tasks waiting for `flask fyyur worker`; rows are deleted
+    # once they succeed and kept as 'failed' after the last attempt.
+    id = db.Column(db.BigInteger, primary_key=True)
+    name = db.Column(db.String(64), nullable=False)
+    args = db.Column(JSONB, nullable=False, server_default='[]')
+    status = db.Column(db.String(16), nullable=False, server_default='queued')
+    attempts = db.Column(db.Integer, nullable=False, server_default='0')
+    run_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = db.Column(db.DateTime(timezone=True))
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f'<Job ID: {self.id}, name: {self.name}, status: {self.status}>'
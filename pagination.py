@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+#----------------------------------------------------------------------------#
+# Keyset pagination.
+#----------------------------------------------------------------------------#
+
+# Pages are addressed by the sort key of the row at their edge rather than
+# by OFFSET, so deep pages cost the same index range scan as page one.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    payload = [{'$dt': value.isoformat()} if isinstance(value, datetime) else value
+               for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list):
+            return None
+        return [datetime.fromisoformat(value['$dt']) if isinstance(value, dict) else value
+                for value in payload]
+    except (ValueError, KeyError, TypeError):
+        # Tampered or stale cursors fall back to the first page.
+        return None
+
+
+def page_size(args, default=DEFAULT_PAGE_SIZE):
+    try:
+        size = int(args.get('limit', default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+class Page:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_paginate(query, keys, args, default_size=DEFAULT_PAGE_SIZE):
+    """Return one Page of `query` ordered ascending by the `keys` columns.
+
+    `args` is the request's query string; `after`/`before` hold cursors and
+    `limit` the page size. Every column in `keys` must be selected by the
+    query under its own name, and the last key must be unique (usually id).
+    Keys must be NOT NULL: the row-value comparison never matches a NULL.
+    """
+    size = page_size(args, default_size)
+    names = [key.key for key in keys]
+    after = decode_cursor(args.get('after', ''))
+    before = decode_cursor(args.get('before', '')) if not after else None
+
+    if before and len(before) == len(keys):
+        rows = query.filter(tuple_(*keys) < tuple_(*before)).order_by(
+            *[key.desc() for key in keys]).limit(size + 1).all()
+        has_more = len(rows) > size
+        rows = list(reversed(rows[:size]))
+        has_prev, has_next = has_more, True
+    else:
+        if after and len(after) == len(keys):
+            query = query.filter(tuple_(*keys) > tuple_(*after))
+        rows = query.order_by(*keys).limit(size + 1).all()
+        has_next = len(rows) > size
+        rows = rows[:size]
+        has_prev = bool(after)
+
+    def cursor_for(row):
+        return encode_cursor([getattr(row, name) for name in names])
+
+    return Page(
+        rows,
+        next_cursor=cursor_for(rows[-1]) if rows and has_next else None,
+        prev_cursor=cursor_for(rows[0]) if rows and has_prev else None,
+    )
@@ -0,0 +1,128 @@
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from models import db
+
+#----------------------------------------------------------------------------#
+# Show partitions.
+#----------------------------------------------------------------------------#
+
+# shows is range-partitioned by start_time, one partition per UTC month
+# (shows_y2026m10), plus shows_default for anything outside them. Queries
+# that bound start_time, like the upcoming lists and /shows, only read the
+# partitions that can hold matching rows. `flask fyyur partitions` keeps
+# PARTITION_MONTHS_AHEAD months of partitions ready and gives months that
+# collected rows in shows_default partitions of their own. It also takes
+# months older than PARTITION_RETAIN_MONTHS out of the table, into the
+# archive schema or dropped. Archived shows leave the venue and artist
+# pages but stay in past_shows_count until `flask fyyur rollover-shows
+# --full`. They also lose their foreign keys: archived rows are no longer
+# tied to venues and artists, which can be deleted and leave their ids
+# dangling there.
+
+PARENT = 'shows'
+DEFAULT = 'shows_default'
+ARCHIVE_SCHEMA = 'archive'
+
+PARTITION_NAME = re.compile(r'^shows_y(\d{4})m(\d{2})$')
+
+LIST_PARTITIONS = """
+    SELECT child.relname, child.reltuples
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.oid = CAST(:parent AS regclass)
+    ORDER BY child.relname
+"""
+
+FOREIGN_KEYS = """
+    SELECT conname FROM pg_constraint
+    WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'
+"""
+
+DEFAULT_MONTHS = f"""
+    SELECT DISTINCT date_trunc('month', start_time AT TIME ZONE 'UTC') FROM {DEFAULT}
+"""
+
+
+def month_start(value):
+    return value.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, months):
+    month_index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(month):
+    return f'shows_y{month:%Y}m{month:%m}'
+
+
+def partitions():
+    """Return {month: (name, estimated rows)} for the attached month partitions."""
+    months = {}
+    for name, rows in db.session.execute(text(LIST_PARTITIONS), {'parent': PARENT}):
+        match = PARTITION_NAME.match(name)
+        if match:
+            month = datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+            months[month] = (name, max(int(rows), 0))
+    return months
+
+
+def plan(months_ahead, retain_months=0, now=None):
+    """Return (months to create, (month, name) pairs to archive)."""
+    current = month_start(now or datetime.now(timezone.utc))
+    existing = partitions()
+    wanted = {add_months(current, i) for i in range(months_ahead + 1)}
+    wanted.update(month.replace(tzinfo=timezone.utc)
+                  for (month,) in db.session.execute(text(DEFAULT_MONTHS)))
+    create = sorted(wanted - set(existing))
+    archive = []
+    if retain_months:
+        cutoff = add_months(current, -retain_months)
+        archive = [(month, name) for month, (name, rows) in sorted(existing.items())
+                   if month < cutoff]
+    return create, archive
+
+
+def create_partition(month):
+    """Create the partition for `month`; returns the rows moved from shows_default."""
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    stray = db.session.execute(text(
+        f'SELECT count(*) FROM {DEFAULT} WHERE start_time >= :start AND start_time < :end'),
+        {'start': start, 'end': end}).scalar()
+    if not stray:
+        db.session.execute(text(f'CREATE TABLE {name} PARTITION OF {PARENT} {bounds}'))
+    else:
+        # Postgres refuses a partition for rows the default partition holds;
+        # move them into a plain table first and attach that. Indexes, the
+        # primary key and foreign keys are added by ATTACH.
+        db.session.execute(text(
+            f'CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+        db.session.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT} WHERE start_time >= :start AND start_time < :end
+                RETURNING *)
+            INSERT INTO {name} SELECT * FROM moved
+        """), {'start': start, 'end': end})
+        db.session.execute(text(f'ALTER TABLE {PARENT} ATTACH PARTITION {name} {bounds}'))
+    db.session.commit()
+    return stray
+
+
+def archive_partition(name, drop=False):
+    db.session.execute(text(f'ALTER TABLE {PARENT} DETACH PARTITION {name}'))
+    if drop:
+        db.session.execute(text(f'DROP TABLE {name}'))
+    else:
+        # A detached partition keeps the foreign keys it inherited, which
+        # would block deleting any venue or artist with archived shows.
+        for (constraint,) in db.session.execute(text(FOREIGN_KEYS), {'table': name}).all():
+            db.session.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT {constraint}'))
+        db.session.execute(text(f'CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}'))
+        db.session.execute(text(f'ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}'))
+    db.session.commit()
@@ -0,0 +1,107 @@
+import threading
+import time
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event, exc, text
+from sqlalchemy.pool import NullPool, QueuePool
+
+#----------------------------------------------------------------------------#
+# Connection pool.
+#----------------------------------------------------------------------------#
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record(self, wait, overflowed):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.overflow_events += overflowed
+
+    def snapshot(self, pool):
+        snapshot = {
+            "pool": type(pool).__name__,
+            "checkouts": self.checkouts,
+            "checkout_wait_ms_avg": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else None,
+            "checkout_wait_ms_max": round(self.wait_max * 1000, 3),
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts
+        }
+        if isinstance(pool, QueuePool):
+            snapshot.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0)
+            })
+        return snapshot
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    # QueuePool that records how long each checkout waited and whether it
+    # had to open an overflow connection.
+    def connect(self):
+        overflow = self.overflow()
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        pool_metrics.record(time.perf_counter() - started,
+                            self.overflow() > max(overflow, 0))
+        return connection
+
+
+def engine_options(config):
+    if config.get('PGBOUNCER_TRANSACTION_MODE'):
+        # PgBouncer owns the pool; holding idle server connections here too
+        # would only pin them.
+        return {'poolclass': NullPool}
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', -1),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', False),
+    }
+    return options
+
+
+def apply_route_statement_timeout(session, transaction, connection):
+    # Request transactions get STATEMENT_TIMEOUT_MS, or their route's own
+    # limit from STATEMENT_TIMEOUTS. It is set per transaction, with SET
+    # LOCAL semantics, rather than on the connection: migrations, CLI
+    # commands and background jobs share the engine and must run without
+    # it, and it never leaks to the next user of a pooled or PgBouncer
+    # connection.
+    if not has_request_context():
+        return
+    config = current_app.config
+    overrides = config.get('STATEMENT_TIMEOUTS', {})
+    timeout = overrides.get(request.endpoint, config.get('STATEMENT_TIMEOUT_MS'))
+    if not timeout and request.endpoint not in overrides:
+        return
+    connection.execute(text("SELECT set_config('statement_timeout', :timeout, true)"),
+                       {'timeout': str(timeout)})
+
+
+def init_app(app, db):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config), **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
+    # db.session is shared by every app created in the process; listen once.
+    if not event.contains(db.session, 'after_begin', apply_route_statement_timeout):
+        event.listen(db.session, 'after_begin', apply_route_statement_timeout)
@@ -0,0 +1,181 @@
+import contextlib
+import itertools
+import threading
+import time
+
+from flask import g, has_app_context, request
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
+from sqlalchemy import event, orm, text
+
+#----------------------------------------------------------------------------#
+# Read replicas.
+#----------------------------------------------------------------------------#
+
+# Each URL in REPLICA_URIS becomes a SQLAlchemy bind. Requests to the
+# endpoints in READ_ENDPOINTS take the next healthy replica in turn, and
+# every statement in them runs there in a READ ONLY transaction. Anything
+# else, including background tasks and CLI commands, uses the primary.
+# After a successful write a client is pinned to the primary for
+# REPLICA_PIN_SECONDS, so the page it is redirected to shows its change.
+# A replica is health-checked at most every REPLICA_CHECK_INTERVAL seconds
+# and skipped while it is unreachable or more than REPLICA_MAX_LAG seconds
+# behind. With no healthy replica, reads go to the primary. Reads that
+# fill a shared cache inside a replica-routed request, like the genre
+# facet counts, run in `with replicas.primary():`.
+
+# Endpoint -> methods that only read. The venue and artist pages are left
+# out: they fill the shared page cache, and a copy read from a lagging
+# replica would be served for the whole CACHE_TTL.
+READ_ENDPOINTS = {
+    'venues': {'GET', 'HEAD'},
+    'search_venues': {'GET', 'HEAD', 'POST'},
+    'artists': {'GET', 'HEAD'},
+    'search_artists': {'GET', 'HEAD', 'POST'},
+    'shows': {'GET', 'HEAD'},
+    'export_rows': {'GET', 'HEAD'},
+}
+
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+PIN_COOKIE = 'fyyur_primary'
+
+# Seconds this standby is behind the primary; 0 once it has replayed
+# everything it received, and 0 on a server that is not a standby.
+REPLICATION_LAG = """
+    SELECT CASE WHEN NOT pg_is_in_recovery()
+                  OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END
+"""
+
+
+class RoutingSession(SignallingSession):
+    def get_bind(self, mapper=None, clause=None):
+        if has_app_context():
+            replica = g.get('db_replica')
+            if replica is not None:
+                return replica.engine
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+class Replica:
+    def __init__(self, bind):
+        self.bind = bind
+        self.engine = None
+        self.healthy = True
+        self.lag = None
+        self.checked_at = None
+        self.reads = 0
+        self._lock = threading.Lock()
+
+    def mark_down(self):
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+
+class ReplicaSet:
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.replicas = []
+        self._turn = itertools.count()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        # Before db.init_app(), like pooling.init_app().
+        self.db = db
+        uris = app.config.get('REPLICA_URIS') or []
+        binds = {f'replica{i}': uri for i, uri in enumerate(uris, 1)}
+        app.config['SQLALCHEMY_BINDS'] = {**(app.config.get('SQLALCHEMY_BINDS') or {}), **binds}
+        self.replicas = [Replica(bind) for bind in binds]
+        self.check_interval = app.config.get('REPLICA_CHECK_INTERVAL', 5)
+        self.max_lag = app.config.get('REPLICA_MAX_LAG', 30)
+        self.pin_seconds = app.config.get('REPLICA_PIN_SECONDS', 10)
+        if self.replicas:
+            app.before_request(self.route_request)
+            app.after_request(self.pin_after_write)
+        app.extensions['replicas'] = self
+
+    def engine(self, replica):
+        if replica.engine is None:
+            engine = self.db.get_engine(bind=replica.bind)
+
+            @event.listens_for(engine, 'handle_error')
+            def mark_down_on_disconnect(context):
+                # A server that went away is out of rotation until its next check.
+                if context.is_disconnect:
+                    replica.mark_down()
+
+            replica.engine = engine.execution_options(postgresql_readonly=True)
+        return replica.engine
+
+    def check(self, replica):
+        if not replica._lock.acquire(blocking=False):
+            return
+        try:
+            with replica.engine.connect() as connection:
+                replica.lag = float(connection.execute(text(REPLICATION_LAG)).scalar())
+            replica.healthy = not self.max_lag or replica.lag <= self.max_lag
+        except Exception:
+            replica.lag = None
+            replica.healthy = False
+        finally:
+            replica.checked_at = time.monotonic()
+            replica._lock.release()
+
+    def pick(self):
+        """Return the next healthy replica, or None to read from the primary."""
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._turn) % len(self.replicas)]
+            self.engine(replica)
+            if replica.checked_at is None or now - replica.checked_at >= self.check_interval:
+                self.check(replica)
+            if replica.healthy:
+                return replica
+        return None
+
+    def is_read(self):
+        return request.method in READ_ENDPOINTS.get(request.endpoint, ())
+
+    def route_request(self):
+        # A request that was already routed, like one the ASGI app serves
+        # through its async engine, keeps its g.db_replica.
+        if not self.is_read() or request.cookies.get(PIN_COOKIE) or 'db_replica' in g:
+            return
+        replica = self.pick()
+        if replica is not None:
+            replica.reads += 1
+            g.db_replica = replica
+
+    @contextlib.contextmanager
+    def primary(self):
+        """Send the enclosed statements to the primary."""
+        replica = g.pop('db_replica', None)
+        try:
+            yield
+        finally:
+            if replica is not None:
+                g.db_replica = replica
+
+    def pin_after_write(self, response):
+        if request.method not in SAFE_METHODS and not self.is_read() and response.status_code < 400:
+            response.set_cookie(PIN_COOKIE, '1', max_age=self.pin_seconds,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def stats(self):
+        return [{
+            "bind": replica.bind,
+            "healthy": replica.healthy,
+            "lag_seconds": replica.lag,
+            "reads": replica.reads
+        } for replica in self.replicas]
+
+
+replicas = ReplicaSet()
@@ -0,0 +1,100 @@
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import func, literal_column, or_
+
+from models import db, Venue, Artist
+
+#----------------------------------------------------------------------------#
+# Search.
+#----------------------------------------------------------------------------#
+
+# Matches go through the expression indexes created in migration
+# 5b1f0c7e9a42: a tsvector GIN index for ranked word-prefix matches and a
+# pg_trgm GIN index that keeps case-insensitive substring matches indexed.
+# The expressions below must stay identical to the indexed ones. Trigrams
+# need at least three characters, so shorter terms only get the word-prefix
+# match: a one or two letter ILIKE would scan the whole table. The result
+# count stops at the last reachable page instead of counting every match.
+
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGES = 50
+MAX_SEARCH_COUNT = SEARCH_PAGE_SIZE * MAX_SEARCH_PAGES
+MIN_SUBSTRING_LENGTH = 3
+
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+
+def search_document(model):
+    return func.fyyur_search_document(model.name, model.city, model.state, model.genres)
+
+
+def search_terms(term):
+    return re.findall(r'\w+', term.lower())
+
+
+def prefix_tsquery(words):
+    return func.to_tsquery(SEARCH_CONFIG, ' & '.join(word + ':*' for word in words))
+
+
+def escape_like(term):
+    return re.sub(r'([\\%_])', r'\\\1', term)
+
+
+def search(model, columns, term, page=1, per_page=SEARCH_PAGE_SIZE):
+    page = max(1, min(page, MAX_SEARCH_PAGES))
+    term = term.strip()
+    words = search_terms(term)
+    query = db.session.query(*columns)
+    if words:
+        document = search_document(model)
+        vector = func.to_tsvector(SEARCH_CONFIG, document)
+        tsquery = prefix_tsquery(words)
+        match = vector.op('@@')(tsquery)
+        if len(term) >= MIN_SUBSTRING_LENGTH:
+            match = or_(match, document.ilike(f"%{escape_like(term)}%"))
+        query = query.filter(match)
+        ordering = [(func.ts_rank(vector, tsquery) +
+                     func.similarity(model.name, term)).desc(), model.id]
+    else:
+        ordering = [model.name, model.id]
+    rows = query.order_by(*ordering).limit(per_page).offset((page - 1) * per_page).all()
+    count = db.session.query(func.count()).select_from(
+        query.limit(MAX_SEARCH_COUNT).subquery()).scalar()
+    return {
+        "count": count,
+        "capped": count >= MAX_SEARCH_COUNT,
+        "data": rows,
+        "page": page,
+        "has_prev": page > 1,
+        "has_next": page * per_page < count and page < MAX_SEARCH_PAGES
+    }
+
+
+def search_venues(term, page=1):
+    return search(Venue, [Venue.id, Venue.name, Venue.city, Venue.state,
+                          Venue.upcoming_shows_count], term, page)
+
+
+def search_artists(term, page=1):
+    return search(Artist, [Artist.id, Artist.name, Artist.city, Artist.state,
+                           Artist.upcoming_shows_count], term, page)
+
+
+def highlight(text, term):
+    # Wraps every occurrence of the searched words in <mark>, escaping the rest.
+    if not text:
+        return ''
+    words = search_terms(term or '')
+    if not words:
+        return escape(text)
+    pattern = re.compile('|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True)),
+                         re.IGNORECASE)
+    parts = []
+    last = 0
+    for match in pattern.finditer(text):
+        parts.append(escape(text[last:match.start()]))
+        parts.append(Markup('<mark>%s</mark>') % match.group(0))
+        last = match.end()
+    parts.append(escape(text[last:]))
+    return Markup('').join(parts)
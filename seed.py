@@ -0,0 +1,114 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from forms import VenueForm
+from ingest import copy_rows
+from models import db, Venue, Artist
+import counters
+
+#----------------------------------------------------------------------------#
+# Synthetic data.
+#----------------------------------------------------------------------------#
+
+# Deterministic for a given --seed (and day): every choice comes from one
+# random.Random, and show times are offsets from today's midnight UTC.
+# Everything is written with COPY, in chunks that each commit.
+
+GENRES = [value for value, label in VenueForm.genres.kwargs['choices']]
+STATES = [value for value, label in VenueForm.state.kwargs['choices']]
+CITIES = ['San Francisco', 'New York', 'Austin', 'Seattle', 'Chicago', 'Denver',
+          'Nashville', 'New Orleans', 'Portland', 'Atlanta', 'Boston', 'Detroit']
+WORDS = ['Musical', 'Hop', 'Park', 'Square', 'Live', 'Dueling', 'Pianos', 'Sax',
+         'Wild', 'Band', 'Petals', 'Guns', 'Room', 'Hall', 'Garage', 'Lounge',
+         'Echo', 'Velvet', 'Neon', 'Blue', 'Iron', 'Golden', 'Static', 'Cellar']
+
+CHUNK_SIZE = 100000
+
+ENTITY_COLUMNS = ('name', 'genres', 'city', 'state', 'phone', 'image_link', 'website',
+                  'facebook_link', 'seeking_description', 'past_shows_count',
+                  'upcoming_shows_count')
+VENUE_COLUMNS = ENTITY_COLUMNS + ('address', 'seeking_talent')
+ARTIST_COLUMNS = ENTITY_COLUMNS + ('seeking_venue',)
+SHOW_COLUMNS = ('venue_id', 'venue_name', 'venue_image_link', 'artist_id', 'artist_name',
+                'artist_image_link', 'start_time')
+
+
+def entity_row(rng, kind, number):
+    name = ' '.join(rng.sample(WORDS, rng.randint(2, 3))) + f' {number}'
+    slug = f'{kind}-{number}'
+    return [
+        name,
+        rng.sample(GENRES, rng.randint(1, 3)),
+        rng.choice(CITIES),
+        rng.choice(STATES),
+        f'{rng.randint(100, 999)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}',
+        f'https://images.example.com/{slug}.jpg',
+        f'https://{slug}.example.com',
+        f'https://www.facebook.com/{slug}',
+        'Looking for new talent' if rng.random() < 0.3 else None,
+        0,
+        0,
+    ]
+
+
+def insert_entities(model, columns, rows):
+    # COPY returns no ids, so read back everything past the previous maximum.
+    max_id = db.session.query(func.coalesce(func.max(model.id), 0)).scalar()
+    copy_rows(model.__tablename__, columns, rows)
+    db.session.commit()
+    return db.session.query(model.id, model.name, model.image_link).filter(
+        model.id > max_id).order_by(model.id).all()
+
+
+def chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def seed(venues=1000, artists=5000, shows=100000, seed=42, hot_venues=10, hot_share=0.3,
+         past_share=0.5, days=365, on_chunk=None):
+    """Insert synthetic venues, artists and shows; returns the show count.
+
+    `hot_share` of all shows go to the first `hot_venues` venues, and
+    `past_share` of them start before today.
+    """
+    rng = random.Random(seed)
+    venue_rows = insert_entities(Venue, VENUE_COLUMNS, [
+        entity_row(rng, 'venue', number) + [f'{rng.randint(1, 9999)} Main St', rng.random() < 0.5]
+        for number in range(venues)])
+    artist_rows = insert_entities(Artist, ARTIST_COLUMNS, [
+        entity_row(rng, 'artist', number) + [rng.random() < 0.5]
+        for number in range(artists)])
+    hot = venue_rows[:max(1, min(hot_venues, len(venue_rows)))]
+    # Naive UTC plus an explicit offset: much cheaper to format than an
+    # aware datetime, which matters at a million rows.
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    span = days * 86400
+
+    def show_rows():
+        for _ in range(shows):
+            venue = rng.choice(hot) if rng.random() < hot_share else rng.choice(venue_rows)
+            artist = rng.choice(artist_rows)
+            offset = rng.randrange(span)
+            if rng.random() < past_share:
+                offset = -offset
+            yield (venue.id, venue.name, venue.image_link, artist.id, artist.name,
+                   artist.image_link, (today + timedelta(seconds=offset)).isoformat() + '+00:00')
+
+    written = 0
+    for chunk in chunks(show_rows(), CHUNK_SIZE):
+        copy_rows('shows', SHOW_COLUMNS, chunk)
+        db.session.commit()
+        written += len(chunk)
+        if on_chunk:
+            on_chunk(written)
+    counters.rollover_shows(full=True)
+    return written
@@ -3,6 +3,41 @@ window.parseISOString = function parseISOString(s) {
   return new Date(Date.UTC(b[0], --b[1], b[2], b[3], b[4], b[5], b[6]));
 };
 
+// Search box suggestions from /autocomplete; picking one opens its page.
+document.querySelectorAll('input[data-autocomplete]').forEach(function (input) {
+  const list = document.getElementById(input.getAttribute('list'))
+  let results = []
+  let timer = null
+  input.addEventListener('input', function (e) {
+    // Picking a suggestion replaces the text (browsers that predate
+    // inputType send a plain Event); typing a name out does not navigate.
+    const picked = !(e instanceof InputEvent) || e.inputType === 'insertReplacementText'
+    const match = picked && results.find(result => result.name === input.value)
+    if (match) {
+      window.location.assign(match.url)
+      return
+    }
+    clearTimeout(timer)
+    timer = setTimeout(function () {
+      const params = new URLSearchParams({ q: input.value, type: input.dataset.autocomplete })
+      fetch('/autocomplete?' + params)
+        .then(res => res.json())
+        .then(jsonRes => {
+          results = jsonRes.results
+          list.innerHTML = ''
+          results.forEach(result => {
+            const option = document.createElement('option')
+            option.value = result.name
+            list.appendChild(option)
+          })
+        })
+        .catch(e => {
+          console.log(e)
+        })
+    }, 100)
+  })
+})
+
 const deleteBtn = document.getElementById('deleteBtn')
 deleteBtn.onclick = function (e) {
   venueId = e.target.dataset['id']
@@ -0,0 +1,209 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, text
+
+from models import db, Job
+
+#----------------------------------------------------------------------------#
+# Background tasks.
+#----------------------------------------------------------------------------#
+
+# Views hand side work to enqueue() and return. In 'thread' mode it runs on
+# a small in-process pool. When the pool's queue is full, or a run fails,
+# the job is written to the jobs table instead, and `flask fyyur worker`
+# runs it there with exponential backoff between attempts. 'db' mode sends
+# every job to the table, and 'inline' runs it immediately in the caller.
+# Tasks must be safe to run more than once.
+
+TASKS = {}
+
+MAX_BACKOFF = 3600
+
+# A job whose lease expired lost its worker mid-run, before it could record
+# a failure. It is rerun like a failed attempt, and failed once it has used
+# up its attempts, so a job that crashes its worker cannot loop forever.
+FAIL_LOST_JOBS = """
+    UPDATE jobs
+    SET status = 'failed', locked_at = NULL,
+        last_error = 'Lease expired on the last attempt; the worker was lost'
+    WHERE status = 'running' AND attempts >= :max_attempts
+      AND locked_at < now() - make_interval(secs => :lease)
+"""
+
+CLAIM_JOB = """
+    UPDATE jobs
+    SET status = 'running', attempts = attempts + 1, locked_at = now()
+    WHERE id = (
+        SELECT id FROM jobs
+        WHERE (status = 'queued' AND run_at <= now())
+           OR (status = 'running' AND attempts < :max_attempts
+               AND locked_at < now() - make_interval(secs => :lease))
+        ORDER BY run_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED)
+    RETURNING id, name, args, attempts, created_at
+"""
+
+
+def task(name):
+    """Register a function that enqueue(name, ...) can run later."""
+    def register(function):
+        TASKS[name] = function
+        return function
+    return register
+
+
+def backoff(attempts, base):
+    return min(base * 2 ** (attempts - 1), MAX_BACKOFF)
+
+
+class TaskMetrics:
+    def __init__(self):
+        self.enqueued = 0
+        self.persisted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def finished(self, latency, ok):
+        with self._lock:
+            self.completed += ok
+            self.failed += not ok
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+
+class TaskQueue:
+    def __init__(self, app=None):
+        self.app = None
+        self.mode = 'inline'
+        self.executor = None
+        self.metrics = TaskMetrics()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.mode = app.config.get('TASK_MODE', 'thread')
+        if self.mode not in ('thread', 'db', 'inline'):
+            raise ValueError(f'Unknown TASK_MODE {self.mode!r}')
+        workers = app.config.get('TASK_WORKERS', 2)
+        self.slots = threading.BoundedSemaphore(workers + app.config.get('TASK_QUEUE_SIZE', 100))
+        self.max_attempts = app.config.get('TASK_MAX_ATTEMPTS', 5)
+        self.retry_backoff = app.config.get('TASK_RETRY_BACKOFF', 5)
+        self.lease = app.config.get('TASK_LEASE', 600)
+        if self.mode == 'thread':
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix='fyyur-task')
+        app.extensions['tasks'] = self
+
+    def enqueue(self, name, *args):
+        if name not in TASKS:
+            raise KeyError(f'Unknown task {name!r}')
+        self.metrics.add(enqueued=1)
+        if self.mode == 'inline':
+            return TASKS[name](*args)
+        if self.mode == 'thread' and self.slots.acquire(blocking=False):
+            self.metrics.add(pending=1)
+            self.executor.submit(self.run_in_thread, name, args, time.perf_counter())
+        else:
+            self.persist(name, args)
+
+    def persist(self, name, args, attempts=0, delay=0, error=None):
+        # Own connection and transaction, whatever state the caller's session is in.
+        with db.engine.begin() as connection:
+            connection.execute(Job.__table__.insert().values(
+                name=name, args=list(args), attempts=attempts, last_error=error,
+                run_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, delay)))
+        self.metrics.add(persisted=1)
+
+    def run_in_thread(self, name, args, enqueued_at):
+        with self.app.app_context():
+            ok = False
+            try:
+                TASKS[name](*args)
+                ok = True
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.exception('Task %s%r failed; queued for retry', name, tuple(args))
+                self.persist(name, args, attempts=1, delay=backoff(1, self.retry_backoff),
+                             error=repr(e))
+            finally:
+                db.session.remove()
+                self.metrics.finished(time.perf_counter() - enqueued_at, ok)
+                self.metrics.add(pending=-1)
+                self.slots.release()
+
+    def claim(self):
+        params = {'lease': self.lease, 'max_attempts': self.max_attempts}
+        with db.engine.begin() as connection:
+            connection.execute(text(FAIL_LOST_JOBS), params)
+            return connection.execute(text(CLAIM_JOB), params).first()
+
+    def run_job(self, job):
+        try:
+            TASKS[job.name](*job.args)
+        except Exception as e:
+            db.session.rollback()
+            self.app.logger.exception('Job %s %s%r failed (attempt %s)',
+                                      job.id, job.name, tuple(job.args), job.attempts)
+            retry = job.attempts < self.max_attempts
+            with db.engine.begin() as connection:
+                connection.execute(text("""
+                    UPDATE jobs SET status = :status, last_error = :error, locked_at = NULL,
+                        run_at = now() + make_interval(secs => :delay)
+                    WHERE id = :id
+                """), {'id': job.id, 'status': 'queued' if retry else 'failed', 'error': repr(e),
+                       'delay': backoff(job.attempts, self.retry_backoff)})
+            self.metrics.finished(time.time() - job.created_at.timestamp(), False)
+            return False
+        finally:
+            db.session.remove()
+        with db.engine.begin() as connection:
+            connection.execute(Job.__table__.delete().where(Job.id == job.id))
+        # Worker latency runs from when the job was first queued.
+        self.metrics.finished(time.time() - job.created_at.timestamp(), True)
+        return True
+
+    def work(self, poll_interval=1.0, burst=False, on_job=None):
+        """Run queued jobs until interrupted, or until none are due with `burst`."""
+        while True:
+            job = self.claim()
+            if job is None:
+                if burst:
+                    return
+                time.sleep(poll_interval)
+                continue
+            ok = self.run_job(job)
+            if on_job:
+                on_job(job, ok)
+
+    def stats(self):
+        metrics = self.metrics
+        finished = metrics.completed + metrics.failed
+        counts = dict(db.session.query(Job.status, func.count()).group_by(Job.status).all())
+        return {
+            "mode": self.mode,
+            "enqueued": metrics.enqueued,
+            "in_process_pending": metrics.pending,
+            "persisted": metrics.persisted,
+            "completed": metrics.completed,
+            "failed": metrics.failed,
+            "latency_ms_avg": round(metrics.latency_total * 1000 / finished, 3) if finished else None,
+            "latency_ms_max": round(metrics.latency_max * 1000, 3),
+            "jobs_queued": counts.get('queued', 0),
+            "jobs_running": counts.get('running', 0),
+            "jobs_failed": counts.get('failed', 0)
+        }
+
+
+tasks = TaskQueue()
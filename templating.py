@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+from flask import render_template
+from jinja2 import FileSystemBytecodeCache
+
+#----------------------------------------------------------------------------#
+# Template compilation.
+#----------------------------------------------------------------------------#
+
+# Compiled templates are kept on disk (TEMPLATE_CACHE_DIR) so a new worker
+# loads bytecode instead of parsing and compiling every template on its
+# first request. `flask fyyur compile-templates` fills the cache at deploy
+# time, and warm_up() loads and renders every template once at startup so
+# the first real requests do not pay for it either. Run in a preloading
+# master, that work is done once and shared by every forked worker.
+
+TEMPLATE_EXTENSIONS = ('.html',)
+
+
+class AtomicBytecodeCache(FileSystemBytecodeCache):
+    # Workers share the directory; write to a temporary file and rename so
+    # nobody loads a half-written entry.
+    def dump_bytecode(self, bucket):
+        filename = self._get_cache_filename(bucket)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as stream:
+                bucket.write_bytecode(stream)
+            os.replace(temp_path, filename)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def init_app(app):
+    directory = app.config.get('TEMPLATE_CACHE_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = AtomicBytecodeCache(directory)
+
+
+def template_names(app):
+    return [name for name in app.jinja_env.list_templates(extensions=None)
+            if name.endswith(TEMPLATE_EXTENSIONS)]
+
+
+def compile_templates(app):
+    """Compile every template into the bytecode cache; returns their names."""
+    names = template_names(app)
+    # Skip the in-memory cache so each template goes through the bytecode cache.
+    if app.jinja_env.cache is not None:
+        app.jinja_env.cache.clear()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return names
+
+
+def warm_up(app):
+    # Rendering with an empty context fails partway for most pages, but by
+    # then the template, its layout and the macros it imports are loaded.
+    names = compile_templates(app)
+    with app.test_request_context('/'):
+        for name in names:
+            try:
+                render_template(name)
+            except Exception:
+                pass
+    # The date filter imports babel and dateutil on first use.
+    if 'datetime' in app.jinja_env.filters:
+        app.jinja_env.filters['datetime']('2019-05-21T21:30:00.000Z')
+    return names
@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def app():
+    # These tests run against a migrated Postgres database; point
+    # DATABASE_URL at a scratch one.
+    if not os.environ.get('DATABASE_URL'):
+        pytest.skip('DATABASE_URL is not set')
+    from app import create_app
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return app
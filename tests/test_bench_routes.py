@@ -0,0 +1,39 @@
+import json
+
+from benchmarks.routes import compare_to_baseline, regressions
+
+
+def run(**p95_ms):
+    return {'sizes': {'10000': {'test_client': {
+        label: {'p95_ms': value} for label, value in p95_ms.items()}}}}
+
+
+def test_regression_past_tolerance_and_slack():
+    found = regressions(run(venues=20.0), run(venues=10.0), tolerance=0.25)
+    assert found == ['venues @ 10000 shows: p95 20.0 ms vs baseline 10.0 ms']
+
+
+def test_within_tolerance_passes():
+    assert regressions(run(venues=12.4), run(venues=10.0), tolerance=0.25) == []
+
+
+def test_small_absolute_change_passes():
+    # 1.0 -> 2.5 ms is +150% but under the 2 ms slack.
+    assert regressions(run(index=2.5), run(index=1.0), tolerance=0.25) == []
+
+
+def test_faster_routes_and_new_routes_pass():
+    assert regressions(run(venues=5.0, metrics=50.0), run(venues=10.0), tolerance=0.25) == []
+
+
+def test_missing_baseline_fails(tmp_path):
+    found = compare_to_baseline(run(venues=10.0), str(tmp_path / 'baseline.json'), 0.25)
+    assert len(found) == 1
+    assert 'no baseline' in found[0]
+
+
+def test_baseline_file_is_compared(tmp_path):
+    path = tmp_path / 'baseline.json'
+    path.write_text(json.dumps(run(venues=10.0, shows=10.0)))
+    found = compare_to_baseline(run(venues=10.0, shows=30.0), str(path), 0.25)
+    assert found == ['shows @ 10000 shows: p95 30.0 ms vs baseline 10.0 ms']
@@ -0,0 +1,38 @@
+import cache
+from cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru = LRUCache(max_entries=2)
+    lru.set('a', 1)
+    lru.set('b', 2)
+    assert lru.get('a') == 1
+    lru.set('c', 3)
+    assert lru.get('b') is None
+    assert lru.get('a') == 1
+    assert lru.get('c') == 3
+    assert len(lru) == 2
+    assert lru.evictions == 1
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    lru = LRUCache(ttl=5)
+    lru.set('a', 1)
+    now[0] += 4.9
+    assert lru.get('a') == 1
+    now[0] += 0.2
+    assert lru.get('a') is None
+    assert len(lru) == 0
+
+
+def test_delete_and_clear():
+    lru = LRUCache()
+    lru.set('a', 1)
+    lru.set('b', 2)
+    lru.delete('a', 'missing')
+    assert lru.get('a') is None
+    assert lru.get('b') == 2
+    lru.clear()
+    assert len(lru) == 0
@@ -0,0 +1,14 @@
+import io
+
+from ingest import read_rows, UnreadableRow
+
+
+def test_malformed_ndjson_lines_are_rejected_rows():
+    stream = io.StringIO('{"name": "A"}\n{broken\n\n[1, 2]\n{"name": "B"}\n')
+    rows = list(read_rows(stream, 'ndjson'))
+    assert [line_num for line_num, row in rows] == [1, 2, 4, 5]
+    assert rows[0][1] == {'name': 'A'}
+    assert isinstance(rows[1][1], UnreadableRow)
+    assert list(rows[1][1].errors) == ['json']
+    assert rows[2][1].errors == {'json': ['Expected a JSON object']}
+    assert rows[3][1] == {'name': 'B'}
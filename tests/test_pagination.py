@@ -0,0 +1,33 @@
+import base64
+from datetime import datetime, timezone
+
+from pagination import decode_cursor, encode_cursor, page_size
+
+
+def encode_raw(raw):
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def test_cursor_round_trip():
+    values = [datetime(2026, 10, 18, 20, 30, tzinfo=timezone.utc), 'CA', 'San Francisco', 42]
+    cursor = encode_cursor(values)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == values
+
+
+def test_malformed_cursors_are_rejected():
+    assert decode_cursor('') is None
+    assert decode_cursor('not a cursor!') is None
+    assert decode_cursor(encode_raw(b'{broken')) is None
+    assert decode_cursor(encode_raw(b'7')) is None
+    assert decode_cursor(encode_raw(b'{"state": "CA"}')) is None
+    assert decode_cursor(encode_raw(b'[{"$dt": "yesterday"}]')) is None
+    assert decode_cursor(encode_raw(b'[{"at": "2026-10-18"}]')) is None
+
+
+def test_page_size_is_clamped():
+    assert page_size({}) == 50
+    assert page_size({'limit': '10'}) == 10
+    assert page_size({'limit': '0'}) == 1
+    assert page_size({'limit': '100000'}) == 200
+    assert page_size({'limit': 'ten'}) == 50
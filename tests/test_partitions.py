@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+import partitions
+from models import db, Venue, Artist, Show
+
+# A month no real show falls in, so the test owns its partition.
+MONTH = datetime(1990, 1, 1, tzinfo=timezone.utc)
+NAME = partitions.partition_name(MONTH)
+
+
+@pytest.fixture
+def archived_show(app):
+    with app.app_context():
+        venue = Venue(name='Archived Hall', genres=['Jazz'], city='Nowhere', state='CA')
+        artist = Artist(name='Archived Band', genres=['Jazz'], city='Nowhere', state='CA')
+        db.session.add_all([venue, artist])
+        db.session.flush()
+        partitions.create_partition(MONTH)
+        db.session.add(Show(start_time=MONTH.replace(day=15), venue_id=venue.id,
+                            venue_name=venue.name, artist_id=artist.id, artist_name=artist.name))
+        db.session.commit()
+        ids = venue.id, artist.id
+        partitions.archive_partition(NAME)
+    yield ids
+    with app.app_context():
+        db.session.execute(text(f'DROP TABLE IF EXISTS {partitions.ARCHIVE_SCHEMA}.{NAME}'))
+        db.session.execute(text(f'DROP TABLE IF EXISTS {NAME}'))
+        Venue.query.filter_by(id=ids[0]).delete()
+        Artist.query.filter_by(id=ids[1]).delete()
+        db.session.commit()
+
+
+def test_archived_partition_has_no_foreign_keys(app, archived_show):
+    with app.app_context():
+        table = f'{partitions.ARCHIVE_SCHEMA}.{NAME}'
+        assert db.session.execute(text(f'SELECT count(*) FROM {table}')).scalar() == 1
+        assert not db.session.execute(text(partitions.FOREIGN_KEYS), {'table': table}).all()
+
+
+def test_delete_venue_after_its_month_is_archived(app, archived_show):
+    venue_id, artist_id = archived_show
+    response = app.test_client().delete(f'/venues/{venue_id}')
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True}
+    with app.app_context():
+        assert Venue.query.get(venue_id) is None
@@ -0,0 +1,40 @@
+from typeahead import normalize, PrefixIndex
+
+
+def build_index():
+    index = PrefixIndex()
+    index.build([(1, 'The Musical Hop'), (2, 'Park Square Live Music & Coffee'),
+                 (3, 'The Dueling Pianos Bar'), (4, None)])
+    return index
+
+
+def test_names_rank_before_later_words():
+    index = build_index()
+    assert index.search('the', 10) == [(0, 'the dueling pianos bar', 3),
+                                       (0, 'the musical hop', 1)]
+    assert index.search('mus', 10) == [(1, 'music & coffee', 2),
+                                       (1, 'musical hop', 1)]
+    assert index.search(normalize('  PARK  Square'), 10) == [
+        (0, 'park square live music & coffee', 2)]
+
+
+def test_each_id_is_returned_once_up_to_the_limit():
+    index = build_index()
+    index.add(5, 'Hop Hop Hop')
+    assert [id for rank, key, id in index.search('hop', 10)] == [5, 1]
+    assert len(index.search('the', 1)) == 1
+
+
+def test_add_and_remove_keep_the_arrays_in_sync():
+    index = build_index()
+    index.add(1, 'The Velvet Room')
+    assert index.search('musical', 10) == []
+    assert index.search('velvet', 10) == [(1, 'velvet room', 1)]
+    index.remove(1)
+    index.remove(99)
+    assert index.search('velvet', 10) == []
+    assert (1, 'the velvet room') not in index.names
+    assert all(id != 1 for key, id in index.words)
+    assert index.names == sorted(index.names)
+    index.add(6, '')
+    assert 6 not in index.entries
@@ -0,0 +1,191 @@
+import bisect
+import threading
+import time
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import func
+
+from models import db, Venue, Artist
+
+#----------------------------------------------------------------------------#
+# Autocomplete.
+#----------------------------------------------------------------------------#
+
+# /autocomplete answers from sorted in-process arrays of venue and artist
+# names, searched with bisect, so a lookup never touches Postgres. A query
+# matches a name that starts with it, ranked first, or any later word of
+# the name ("hop" finds "The Musical Hop"). The index is loaded once, in
+# the gunicorn master when preloading so workers share it, otherwise on the
+# first lookup. The views update it as they create, edit and delete rows.
+# Changes made by other workers, imports and seeding are picked up by a
+# background refresh at most every AUTOCOMPLETE_REFRESH seconds. It reloads
+# rows whose updated_at moved since the last one, and rebuilds everything
+# when the row count shows that something was deleted.
+
+MODELS = {'venue': Venue, 'artist': Artist}
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+
+# Rows are reread from a little before the last refresh, in case a
+# transaction that stamped them earlier committed after it.
+REFRESH_OVERLAP = 60
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+class PrefixIndex:
+    """Sorted (key, id) arrays over one kind of name."""
+
+    def __init__(self):
+        self.names = []
+        self.words = []
+        self.entries = {}
+
+    @staticmethod
+    def keys(name):
+        # The whole name, then the name from each later word onwards.
+        words = normalize(name).split(' ')
+        return ' '.join(words), [' '.join(words[i:]) for i in range(1, len(words))]
+
+    def build(self, rows):
+        self.entries = {id: name for id, name in rows if name}
+        self.names, self.words = [], []
+        for id, name in self.entries.items():
+            key, word_keys = self.keys(name)
+            self.names.append((key, id))
+            self.words.extend((word_key, id) for word_key in word_keys)
+        self.names.sort()
+        self.words.sort()
+
+    def add(self, id, name):
+        self.remove(id)
+        if not name:
+            return
+        self.entries[id] = name
+        key, word_keys = self.keys(name)
+        bisect.insort(self.names, (key, id))
+        for word_key in word_keys:
+            bisect.insort(self.words, (word_key, id))
+
+    def remove(self, id):
+        name = self.entries.pop(id, None)
+        if name is None:
+            return
+        key, word_keys = self.keys(name)
+        for array, keys in ((self.names, [key]), (self.words, word_keys)):
+            for entry in keys:
+                i = bisect.bisect_left(array, (entry, id))
+                if i < len(array) and array[i] == (entry, id):
+                    del array[i]
+
+    def search(self, query, limit):
+        """Return up to `limit` (rank, key, id) matches for a normalized query."""
+        matches, seen = [], set()
+        for rank, array in enumerate((self.names, self.words)):
+            i = bisect.bisect_left(array, (query,))
+            while i < len(array) and len(matches) < limit and array[i][0].startswith(query):
+                key, id = array[i]
+                if id not in seen:
+                    seen.add(id)
+                    matches.append((rank, key, id))
+                i += 1
+        return matches
+
+
+class Typeahead:
+    def __init__(self, app=None):
+        self.indexes = {kind: PrefixIndex() for kind in MODELS}
+        self.loaded = False
+        self.refresh_interval = 0
+        self.refreshed_at = None
+        self.watermark = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get('AUTOCOMPLETE_REFRESH', 30)
+        app.extensions['typeahead'] = self
+
+    def load(self):
+        """(Re)build every index from the database."""
+        watermark = db.session.query(func.now()).scalar()
+        rows = {kind: db.session.query(model.id, model.name).all()
+                for kind, model in MODELS.items()}
+        indexes = {kind: PrefixIndex() for kind in MODELS}
+        for kind, index in indexes.items():
+            index.build(rows[kind])
+        with self._lock:
+            self.indexes = indexes
+            self.watermark = watermark
+            self.refreshed_at = time.monotonic()
+            self.loaded = True
+
+    def refresh(self):
+        watermark = db.session.query(func.now()).scalar()
+        since = self.watermark - timedelta(seconds=REFRESH_OVERLAP)
+        for kind, model in MODELS.items():
+            changed = db.session.query(model.id, model.name).filter(model.updated_at >= since).all()
+            with self._lock:
+                for id, name in changed:
+                    self.indexes[kind].add(id, name)
+                indexed = len(self.indexes[kind].entries)
+            # Every row changed since the last refresh is in the index now, so
+            # any surplus is a row that has been deleted.
+            if db.session.query(func.count(model.id)).filter(model.name.isnot(None)).scalar() != indexed:
+                return self.load()
+        with self._lock:
+            self.watermark = watermark
+            self.refreshed_at = time.monotonic()
+
+    def refresh_in_thread(self, app):
+        with app.app_context():
+            try:
+                self.refresh()
+            except Exception:
+                app.logger.exception('Autocomplete refresh failed')
+            finally:
+                db.session.remove()
+                self._refreshing = False
+
+    def maybe_refresh(self):
+        if not self.refresh_interval or self._refreshing:
+            return
+        if time.monotonic() - self.refreshed_at < self.refresh_interval:
+            return
+        self._refreshing = True
+        threading.Thread(target=self.refresh_in_thread, args=(current_app._get_current_object(),),
+                         name='fyyur-typeahead', daemon=True).start()
+
+    def add(self, kind, id, name):
+        with self._lock:
+            self.indexes[kind].add(int(id), name)
+
+    def remove(self, kind, id):
+        with self._lock:
+            self.indexes[kind].remove(int(id))
+
+    def search(self, query, kinds=None, limit=DEFAULT_LIMIT):
+        """Return up to `limit` (kind, id, name) names matching `query`."""
+        if not self.loaded:
+            self.load()
+        self.maybe_refresh()
+        query = normalize(query)
+        if not query:
+            return []
+        matches = []
+        with self._lock:
+            for kind in kinds or MODELS:
+                index = self.indexes[kind]
+                matches.extend((rank, key, kind, id, index.entries[id])
+                               for rank, key, id in index.search(query, limit))
+        matches.sort()
+        return [(kind, id, name) for rank, key, kind, id, name in matches[:limit]]
+
+
+typeahead = Typeahead()
@@ -0,0 +1,691 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+from forms import *
+from sqlalchemy import func
+from flask import current_app, render_template, request, Response, flash, redirect, url_for, jsonify, abort, stream_with_context
+from models import db, Venue, Artist, Show
+from pagination import keyset_paginate
+import search
+from cache import cache, venue_key, artist_key, genres_key
+from counters import show_cutoff
+import export
+import facets
+import feed
+import fanout
+from tasks import tasks
+from replicas import replicas
+from typeahead import typeahead, DEFAULT_LIMIT, MAX_LIMIT
+import pooling
+from datetime import datetime, timezone
+import functools
+
+#----------------------------------------------------------------------------#
+# Registration.
+#----------------------------------------------------------------------------#
+
+# Views are collected here and attached to each app by init_app(), so the
+# endpoint names stay 'venues', 'show_venue' and so on.
+
+ROUTES = []
+ERROR_HANDLERS = []
+
+
+def route(rule, **options):
+    def register(view):
+        ROUTES.append((rule, options, view))
+        return view
+    return register
+
+
+def errorhandler(code):
+    def register(handler):
+        ERROR_HANDLERS.append((code, handler))
+        return handler
+    return register
+
+
+def init_app(app):
+    for rule, options, view in ROUTES:
+        app.add_url_rule(rule, view_func=view, **options)
+    for code, handler in ERROR_HANDLERS:
+        app.register_error_handler(code, handler)
+    app.jinja_env.filters.update(FILTERS)
+
+#----------------------------------------------------------------------------#
+# Filters.
+#----------------------------------------------------------------------------#
+
+
+DATETIME_FORMATS = {
+    'full': "EEEE MMMM, d, y 'at' h:mma",
+    'medium': "EE MM, dd, y h:mma"
+}
+
+
+# babel and dateutil are imported on first use rather than with the app;
+# templating.warm_up() makes that first use happen before any traffic.
+
+@functools.lru_cache(maxsize=64)
+def datetime_pattern(format, locale):
+    # Parsing the pattern and the locale is the expensive part of a babel
+    # format call, so it is done once per (format, locale).
+    import babel.dates
+    return babel.dates.parse_pattern(DATETIME_FORMATS.get(format, format)), babel.Locale.parse(locale)
+
+
+def format_datetime(value, format='medium', locale='en'):
+    if isinstance(value, str):
+        import dateutil.parser
+        value = dateutil.parser.parse(value)
+    if format in ('long', 'short'):
+        import babel.dates
+        return babel.dates.format_datetime(value, format, locale=locale)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    pattern, locale = datetime_pattern(format, locale)
+    return pattern.apply(value, locale)
+
+
+def format_datetimes(values, format='medium', locale='en'):
+    # Bulk variant for lists of shows: the pattern is looked up once.
+    values = list(values)
+    if format in ('long', 'short') or any(isinstance(value, str) for value in values):
+        return [format_datetime(value, format, locale) for value in values]
+    pattern, locale = datetime_pattern(format, locale)
+    return [pattern.apply(value if value.tzinfo else value.replace(tzinfo=timezone.utc), locale)
+            for value in values]
+
+
+FILTERS = {
+    'datetime': format_datetime,
+    'datetimes': format_datetimes,
+    'highlight': search.highlight
+}
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+
+@route('/')
+def index():
+    return render_template('pages/home.html')
+
+
+#  Venues
+#  ----------------------------------------------------------------
+
+@route('/venues')
+def venues():
+    # num_upcoming_shows is aggregated in a single grouped query instead of
+    # one count() per venue; areas are then grouped with a dict lookup.
+    data = []
+    page = None
+    counts = []
+    genre = request.args.get('genre', '').strip() or None
+    try:
+        upcoming = db.session.query(
+            Show.venue_id,
+            func.count(Show.id).label('num_upcoming_shows')
+        ).filter(Show.start_time > datetime.now()).group_by(Show.venue_id).subquery()
+        query = db.session.query(
+            Venue.id, Venue.name, Venue.city, Venue.state,
+            func.coalesce(upcoming.c.num_upcoming_shows,
+                          0).label('num_upcoming_shows')
+        ).outerjoin(upcoming, upcoming.c.venue_id == Venue.id)
+        if genre:
+            query = query.filter(facets.has_genre(Venue, genre))
+        counts = facets.genre_counts('venue')
+        page = keyset_paginate(
+            query, [Venue.state, Venue.city, Venue.id], request.args)
+        areas = {}
+        for row in page:
+            area = areas.get((row.state, row.city))
+            if area is None:
+                area = {
+                    "city": row.city,
+                    "state": row.state,
+                    "venues": []
+                }
+                areas[(row.state, row.city)] = area
+                data.append(area)
+            area['venues'].append({
+                "id": row.id,
+                "name": row.name,
+                "num_upcoming_shows": row.num_upcoming_shows
+            })
+    except Exception:
+        current_app.logger.exception('Could not list venues')
+    finally:
+        db.session.close()
+
+    return render_template('pages/venues.html', areas=data, page=page,
+                           genre=genre, genre_counts=counts)
+
+
+@route('/venues/search', methods=['GET', 'POST'])
+def search_venues():
+    # Ranked, case-insensitive search over name, city, state and genres.
+    # seach for Hop should return "The Musical Hop".
+    # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee"
+    search_term = request.values.get('search_term', '')
+    response = {
+        "count": 0,
+        "data": []
+    }
+
+    try:
+        response = search.search_venues(
+            search_term, request.values.get('page', 1, type=int))
+    except Exception:
+        current_app.logger.exception('Venue search failed for %r', search_term)
+    finally:
+        db.session.close()
+
+    return render_template('pages/search_venues.html', results=response, search_term=search_term)
+
+
+@route('/venues/<int:venue_id>')
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    # TODO: replace with real venue data from the venues table, using venue_id
+    data = cache.get(venue_key(venue_id))
+    if data is not None:
+        return render_template('pages/show_venue.html', venue=data)
+    data = {}
+    rows = None
+    try:
+        # One round trip: the venue's columns repeat on each of its shows,
+        # which arrive in start_time order and are split in a single pass.
+        rows = db.session.query(
+            Venue.id, Venue.name, Venue.genres, Venue.address, Venue.city, Venue.state,
+            Venue.phone, Venue.website, Venue.facebook_link, Venue.seeking_talent,
+            Venue.seeking_description, Venue.image_link,
+            Show.artist_id, Show.artist_name, Show.artist_image_link, Show.start_time,
+            (Show.start_time > datetime.now()).label('is_upcoming')
+        ).outerjoin(Show, Show.venue_id == Venue.id).filter(
+            Venue.id == venue_id).order_by(Show.start_time).all()
+        if rows:
+            past_shows = []
+            upcoming_shows = []
+            for row in rows:
+                if row.start_time is None:
+                    continue
+                (upcoming_shows if row.is_upcoming else past_shows).append({
+                    "artist_id": row.artist_id,
+                    "artist_name": row.artist_name,
+                    "artist_image_link": row.artist_image_link,
+                    "start_time": row.start_time
+                })
+            venue = rows[0]
+            data = {
+                "id": venue.id,
+                "name": venue.name,
+                "genres": venue.genres,
+                "address": venue.address,
+                "city": venue.city,
+                "state": venue.state,
+                "phone": venue.phone,
+                "website": venue.website,
+                "facebook_link": venue.facebook_link,
+                "seeking_talent": venue.seeking_talent,
+                "seeking_description": venue.seeking_description,
+                "image_link": venue.image_link,
+                "past_shows": past_shows,
+                "upcoming_shows": upcoming_shows,
+                "past_shows_count": len(past_shows),
+                "upcoming_shows_count": len(upcoming_shows)
+            }
+            cache.set(venue_key(venue_id), data)
+    except Exception:
+        current_app.logger.exception('Could not load venue %s', venue_id)
+    finally:
+        db.session.close()
+
+    if rows == []:
+        abort(404)
+    return render_template('pages/show_venue.html', venue=data)
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@route('/venues/create', methods=['GET'])
+def create_venue_form():
+    form = VenueForm()
+    return render_template('forms/new_venue.html', form=form)
+
+
+@route('/venues/create', methods=['POST'])
+def create_venue_submission():
+    # TODO: insert form data as a new Venue record in the db, instead
+    # TODO: modify data to be the data object returned from db insertion
+    form = VenueForm(request.form, meta={'csrf': False})
+    try:
+        if form.validate_on_submit():
+            # on successful db insert, flash success
+            venue = Venue(name=form.name.data, genres=form.genres.data, city=form.city.data, state=form.state.data, address=form.address.data, phone=form.phone.data, image_link=form.image_link.data,
+                          facebook_link=form.facebook_link.data, website=form.website_link.data, seeking_talent=form.seeking_talent.data, seeking_description=form.seeking_description.data)
+            db.session.add(venue)
+            db.session.commit()
+            cache.invalidate(genres_key('venue'))
+            typeahead.add('venue', venue.id, venue.name)
+            flash('Venue ' + venue.name + ' was successfully listed!')
+        else:
+            for field, message in form.errors.items():
+                flash(field + ' - ' + str(message))
+            return render_template('forms/new_venue.html', form=form)
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception('Could not create venue')
+        flash('An error occurred. Venue ' +
+              form.name.data + ' could not be listed.')
+    finally:
+        db.session.close()
+    # TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Venue ' + data.name + ' could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return redirect(url_for('index'))
+
+
+@route('/venues/<venue_id>', methods=['DELETE'])
+def delete_venue(venue_id):
+    # TODO: Complete this endpoint for taking a venue_id, and using
+    # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail.
+
+    # BONUS CHALLENGE: Implement a button to delete a Venue on a Venue Page, have it so that
+    # clicking that button delete it from the db then redirect the user to the homepage
+    error = False
+    venue_name = ""
+    try:
+        venue_to_delete = Venue.query.filter_by(id=venue_id).first()
+        venue_name = venue_to_delete.name
+        artist_ids = [artist_id for (artist_id,) in db.session.query(
+            Show.artist_id).filter(Show.venue_id == venue_to_delete.id).distinct()]
+        db.session.delete(venue_to_delete)
+        db.session.commit()
+        cache.invalidate(venue_key(venue_id), genres_key('venue'),
+                         *[artist_key(artist_id) for artist_id in artist_ids])
+        typeahead.remove('venue', venue_id)
+        flash('Venue ' + venue_name + ' was successfully deleted!')
+    except Exception:
+        current_app.logger.exception('Could not delete venue %s', venue_id)
+        error = True
+        flash('An error occurred. Venue ' +
+              venue_name + ' could not be deleted.')
+    finally:
+        if error:
+            return abort(500)
+        else:
+            return jsonify({'success': True})
+
+#  Artists
+#  ----------------------------------------------------------------
+
+
+@route('/artists')
+def artists():
+    genre = request.args.get('genre', '').strip() or None
+    query = Artist.query.with_entities(Artist.id, Artist.name)
+    if genre:
+        query = query.filter(facets.has_genre(Artist, genre))
+    page = keyset_paginate(query, [Artist.name, Artist.id], request.args)
+    return render_template('pages/artists.html', artists=page.items, page=page,
+                           genre=genre, genre_counts=facets.genre_counts('artist'))
+
+
+@route('/artists/search', methods=['GET', 'POST'])
+def search_artists():
+    # Ranked, case-insensitive search over name, city, state and genres.
+    # seach for "A" should return "Guns N Petals", "Matt Quevado", and "The Wild Sax Band".
+    # search for "band" should return "The Wild Sax Band".
+    search_term = request.values.get('search_term', '')
+    response = {
+        "count": 0,
+        "data": []
+    }
+
+    try:
+        response = search.search_artists(
+            search_term, request.values.get('page', 1, type=int))
+    except Exception:
+        current_app.logger.exception('Artist search failed for %r', search_term)
+    finally:
+        db.session.close()
+    return render_template('pages/search_artists.html', results=response, search_term=search_term)
+
+
+@route('/autocomplete')
+def autocomplete():
+    # Typeahead for the search boxes; ?type=venue or artist narrows it down.
+    kind = request.args.get('type')
+    kinds = [kind] if kind in ('venue', 'artist') else None
+    limit = max(1, min(request.args.get('limit', DEFAULT_LIMIT, type=int), MAX_LIMIT))
+    results = typeahead.search(request.args.get('q', ''), kinds, limit)
+    return jsonify({
+        "results": [{
+            "type": kind,
+            "id": id,
+            "name": name,
+            "url": url_for('show_' + kind, **{kind + '_id': id})
+        } for kind, id, name in results]
+    })
+
+
+@route('/artists/<int:artist_id>')
+def show_artist(artist_id):
+    # shows the artist page with the given artist_id
+    # TODO: replace with real artist data from the artist table, using artist_id
+    data = cache.get(artist_key(artist_id))
+    if data is not None:
+        return render_template('pages/show_artist.html', artist=data)
+    data = {}
+    rows = None
+    try:
+        # One round trip: the artist's columns repeat on each of its shows,
+        # which arrive in start_time order and are split in a single pass.
+        rows = db.session.query(
+            Artist.id, Artist.name, Artist.genres, Artist.city, Artist.state,
+            Artist.phone, Artist.website, Artist.facebook_link, Artist.seeking_venue,
+            Artist.seeking_description, Artist.image_link,
+            Show.venue_id, Show.venue_name, Show.venue_image_link, Show.start_time,
+            (Show.start_time > datetime.now()).label('is_upcoming')
+        ).outerjoin(Show, Show.artist_id == Artist.id).filter(
+            Artist.id == artist_id).order_by(Show.start_time).all()
+        if rows:
+            past_shows = []
+            upcoming_shows = []
+            for row in rows:
+                if row.start_time is None:
+                    continue
+                (upcoming_shows if row.is_upcoming else past_shows).append({
+                    "venue_id": row.venue_id,
+                    "venue_name": row.venue_name,
+                    "venue_image_link": row.venue_image_link,
+                    "start_time": row.start_time
+                })
+            artist = rows[0]
+            data = {
+                "id": artist.id,
+                "name": artist.name,
+                "genres": artist.genres,
+                "city": artist.city,
+                "state": artist.state,
+                "phone": artist.phone,
+                "website": artist.website,
+                "facebook_link": artist.facebook_link,
+                "seeking_venue": artist.seeking_venue,
+                "seeking_description": artist.seeking_description,
+                "image_link": artist.image_link,
+                "past_shows": past_shows,
+                "upcoming_shows": upcoming_shows,
+                "past_shows_count": len(past_shows),
+                "upcoming_shows_count": len(upcoming_shows)
+            }
+            cache.set(artist_key(artist_id), data)
+    except Exception:
+        current_app.logger.exception('Could not load artist %s', artist_id)
+    finally:
+        db.session.close()
+
+    if rows == []:
+        abort(404)
+    return render_template('pages/show_artist.html', artist=data)
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+    form = ArtistForm()
+    # TODO: populate form with fields from artist with ID <artist_id>
+    artist = Artist.query.filter_by(id=artist_id).first()
+    form.name.data = artist.name
+    form.genres.data = artist.genres
+    form.city.data = artist.city
+    form.state.data = artist.state
+    form.phone.data = artist.phone
+    form.website_link.data = artist.website
+    form.facebook_link.data = artist.facebook_link
+    form.seeking_venue.data = artist.seeking_venue
+    form.seeking_description.data = artist.seeking_description
+    form.image_link.data = artist.image_link
+    return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+
+@route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+    # TODO: take values from the form submitted, and update existing
+    # artist record with ID <artist_id> using the new attributes
+    form = ArtistForm(request.form)
+    try:
+        artist = Artist.query.filter_by(id=artist_id).first()
+        renamed = (artist.name, artist.image_link) != (form.name.data, form.image_link.data)
+        artist.name = form.name.data
+        artist.genres = form.genres.data
+        artist.city = form.city.data
+        artist.state = form.state.data
+        artist.phone = form.phone.data
+        artist.website = form.website_link.data
+        artist.facebook_link = form.facebook_link.data
+        artist.seeking_venue = form.seeking_venue.data
+        artist.seeking_description = form.seeking_description.data
+        artist.image_link = form.image_link.data
+        # Shows keep copies of the name and image link.
+        stale_keys = fanout.update_shows('artist', artist_id) if renamed else []
+        db.session.commit()
+        cache.invalidate(artist_key(artist_id), genres_key('artist'), *(stale_keys or []))
+        typeahead.add('artist', artist_id, form.name.data)
+        if stale_keys is None:
+            fanout.schedule('artist', artist_id)
+    except Exception:
+        current_app.logger.exception('Could not update artist %s', artist_id)
+        db.session.rollback()
+    finally:
+        db.session.close()
+
+    return redirect(url_for('show_artist', artist_id=artist_id))
+
+
+@route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+    form = VenueForm()
+    # TODO: populate form with values from venue with ID <venue_id>
+    venue = Venue.query.filter_by(id=venue_id).first()
+    form.name.data = venue.name
+    form.genres.data = venue.genres
+    form.address.data = venue.address
+    form.city.data = venue.city
+    form.state.data = venue.state
+    form.phone.data = venue.phone
+    form.website_link.data = venue.website
+    form.facebook_link.data = venue.facebook_link
+    form.seeking_talent.data = venue.seeking_talent
+    form.seeking_description.data = venue.seeking_description
+    form.image_link.data = venue.image_link
+    return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+
+@route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+    # TODO: take values from the form submitted, and update existing
+    # venue record with ID <venue_id> using the new attributes
+    form = VenueForm(request.form)
+    try:
+        venue = Venue.query.filter_by(id=venue_id).first()
+        renamed = (venue.name, venue.image_link) != (form.name.data, form.image_link.data)
+        venue.name = form.name.data
+        venue.genres = form.genres.data
+        venue.address = form.address.data
+        venue.city = form.city.data
+        venue.state = form.state.data
+        venue.phone = form.phone.data
+        venue.website = form.website_link.data
+        venue.facebook_link = form.facebook_link.data
+        venue.seeking_talent = form.seeking_talent.data
+        venue.seeking_description = form.seeking_description.data
+        venue.image_link = form.image_link.data
+        # Shows keep copies of the name and image link.
+        stale_keys = fanout.update_shows('venue', venue_id) if renamed else []
+        db.session.commit()
+        cache.invalidate(venue_key(venue_id), genres_key('venue'), *(stale_keys or []))
+        typeahead.add('venue', venue_id, form.name.data)
+        if stale_keys is None:
+            fanout.schedule('venue', venue_id)
+    except Exception:
+        current_app.logger.exception('Could not update venue %s', venue_id)
+        db.session.rollback()
+    finally:
+        db.session.close()
+
+    return redirect(url_for('show_venue', venue_id=venue_id))
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@route('/artists/create', methods=['GET'])
+def create_artist_form():
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+
+@route('/artists/create', methods=['POST'])
+def create_artist_submission():
+    # called upon submitting the new artist listing form
+    # TODO: insert form data as a new Venue record in the db, instead
+    # TODO: modify data to be the data object returned from db insertion
+    form = ArtistForm(request.form, meta={'csrf': False})
+
+    try:
+        if form.validate_on_submit():
+            artist = Artist(name=form.name.data, genres=form.genres.data, city=form.city.data, state=form.state.data, phone=form.phone.data, image_link=form.image_link.data,
+                            facebook_link=form.facebook_link.data, website=form.website_link.data, seeking_venue=form.seeking_venue.data, seeking_description=form.seeking_description.data)
+            db.session.add(artist)
+            db.session.commit()
+            cache.invalidate(genres_key('artist'))
+            typeahead.add('artist', artist.id, artist.name)
+            # on successful db insert, flash success
+            flash('Artist ' + artist.name + ' was successfully listed!')
+        else:
+            for field, message in form.errors.items():
+                flash(field + ' - ' + str(message))
+            return render_template('forms/new_artist.html', form=form)
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception('Could not create artist')
+        flash('An error occurred. Artist ' +
+              form.name.data + ' could not be listed.')
+    finally:
+        db.session.close()
+    # TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Artist ' + data.name + ' could not be listed.')
+    return redirect(url_for('index'))
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+@route('/shows')
+def shows():
+    # displays list of shows at /shows, upcoming first unless ?from= says otherwise
+    filters = feed.parse_filters(request.args)
+    page = keyset_paginate(
+        feed.show_query(filters), [Show.start_time, Show.id], request.args)
+    return render_template('pages/shows.html', shows=page, page=page, genres=GENRES,
+                           filters={name: request.args.get(name) for name in feed.FILTERS})
+
+
+@route('/shows/create')
+def create_shows():
+    # renders form. do not touch.
+    form = ShowForm()
+    return render_template('forms/new_show.html', form=form)
+
+
+@route('/shows/create', methods=['POST'])
+def create_show_submission():
+    # called to create new shows in the db, upon submitting new show listing form
+    # TODO: insert form data as a new Show record in the db, instead
+    form = ShowForm(request.form)
+
+    # on successful db insert, flash success
+    try:
+        venue = Venue.query.filter_by(id=form.venue_id.data).first()
+        artist = Artist.query.filter_by(id=form.artist_id.data).first()
+
+        show = Show(start_time=form.start_time.data,
+                    venue_id=venue.id, venue_name=venue.name, venue_image_link=venue.image_link, artist_id=artist.id, artist_name=artist.name, artist_image_link=artist.image_link)
+        # Counters are kept as of the rollover watermark; `flask fyyur
+        # rollover-shows` moves the show to past once it has started.
+        if show.start_time > show_cutoff():
+            venue.upcoming_shows_count += 1
+            artist.upcoming_shows_count += 1
+        else:
+            venue.past_shows_count += 1
+            artist.past_shows_count += 1
+        stale_keys = [venue_key(venue.id), artist_key(artist.id)]
+        db.session.add(show)
+        db.session.commit()
+        cache.invalidate(*stale_keys)
+        flash('Show was successfully listed!')
+    except Exception:
+        current_app.logger.exception('Could not create show')
+        db.session.rollback()
+        flash('An error occurred. Show could not be listed.')
+    finally:
+        db.session.close()
+    # TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Show could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return redirect(url_for('index'))
+
+
+#  Export
+#  ----------------------------------------------------------------
+
+def datetime_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        abort(400)
+
+
+@route('/export/<any(venues, artists, shows):kind>.<any(ndjson, csv):fmt>')
+def export_rows(kind, fmt):
+    # Streams the whole table (or the filtered slice) off a server-side cursor.
+    # ?updated_since= for incremental syncs; ?from=/?to= bound show start_time.
+    query = export.export_query(kind, updated_since=datetime_arg('updated_since'),
+                                start=datetime_arg('from'), end=datetime_arg('to'))
+    serialize, mimetype = export.SERIALIZERS[fmt]
+    return Response(stream_with_context(serialize(kind, query)), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={kind}.{fmt}'
+    })
+
+
+#  Metrics
+#  ----------------------------------------------------------------
+
+@route('/metrics')
+def metrics():
+    return jsonify({
+        "cache": cache.stats(),
+        "pool": pooling.pool_metrics.snapshot(db.engine.pool),
+        "tasks": tasks.stats(),
+        "replicas": replicas.stats()
+    })
+
+
+@errorhandler(404)
+def not_found_error(error):
+    return render_template('errors/404.html'), 404
+
+
+@errorhandler(500)
+def server_error(error):
+    return render_template('errors/500.html'), 500